@@ -1,17 +1,111 @@
 """Main Flask application for the chatbot component."""
 import os
+import threading
+import time
+from functools import wraps
+from typing import Optional
 from flask import Flask, request, jsonify, render_template, send_from_directory
 from werkzeug.utils import secure_filename
 from config import Config
+import assets
 from services.pdf_processor import PDFProcessor
 from services.chat_service import ChatService
+from services.admission import AdmissionPool, Rejected, parse_priorities
+from services.tokens import load_tokenizer
 
 app = Flask(__name__)
 app.config.from_object(Config)
+assets.init_app(app)
 
-# Initialize services
-pdf_processor = PDFProcessor()
-chat_service = ChatService()
+# Services are created on first use or by the warm-up hook, so importing
+# the app (container start, test collection) stays cheap.
+_services_lock = threading.Lock()
+_pdf_processor: Optional[PDFProcessor] = None
+_chat_service: Optional[ChatService] = None
+
+_warm_up_lock = threading.Lock()
+_warm_up_thread: Optional[threading.Thread] = None
+_warm_up_done = threading.Event()
+_warm_up_state = {'seconds': None, 'error': None}
+
+# Admission control: uploads are CPU-heavy and chats are I/O-bound, so each
+# gets its own bounded pool and neither can take the other's capacity.
+upload_admission = AdmissionPool('upload', Config.UPLOAD_MAX_CONCURRENT,
+                                 Config.UPLOAD_MAX_QUEUE_SECONDS, Config.UPLOAD_MAX_QUEUE)
+chat_admission = AdmissionPool('chat', Config.CHAT_MAX_CONCURRENT,
+                               Config.CHAT_MAX_QUEUE_SECONDS, Config.CHAT_MAX_QUEUE)
+_api_key_priorities = parse_priorities(Config.API_KEY_PRIORITIES)
+
+def admission_controlled(pool: AdmissionPool):
+    """Run the view inside an admission pool, answering 503 with Retry-After when shed."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            priority = _api_key_priorities.get(request.headers.get('X-API-Key', ''), 0)
+            try:
+                with pool.admit(priority):
+                    return view(*args, **kwargs)
+            except Rejected as e:
+                response = jsonify({
+                    'error': 'Server is busy. Please try again later.',
+                    'status': 503
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+        return wrapper
+    return decorator
+
+def get_pdf_processor() -> PDFProcessor:
+    """Return the shared PDF processor, creating it on first use."""
+    global _pdf_processor
+    if _pdf_processor is None:
+        with _services_lock:
+            if _pdf_processor is None:
+                _pdf_processor = PDFProcessor()
+    return _pdf_processor
+
+def get_chat_service() -> ChatService:
+    """Return the shared chat service, creating it on first use."""
+    global _chat_service
+    if _chat_service is None:
+        with _services_lock:
+            if _chat_service is None:
+                _chat_service = ChatService()
+    return _chat_service
+
+def warm_up() -> None:
+    """Load heavy modules and create services ahead of the first request.
+    
+    The app reports ready once the services exist; the PDF extraction
+    workers are started afterwards, since each one re-imports the app.
+    """
+    started = time.perf_counter()
+    try:
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        import PyPDF2  # noqa: F401  PDF parsing
+        import openai  # noqa: F401  LLM client
+        load_tokenizer()
+        get_pdf_processor()
+        get_chat_service()
+    except Exception as e:
+        _warm_up_state['error'] = str(e)
+    finally:
+        _warm_up_state['seconds'] = time.perf_counter() - started
+        _warm_up_done.set()
+    try:
+        get_pdf_processor().start_workers()
+    except Exception:
+        # Uploads start a worker on demand if the pool could not be started
+        pass
+
+def start_warm_up() -> None:
+    """Run warm_up once in a background thread."""
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+            _warm_up_thread.start()
 
 def allowed_file(filename):
     """Check if the file extension is allowed."""
@@ -22,7 +116,53 @@ def index():
     """Render the main page."""
     return render_template('index.html')
 
+@app.route('/healthz')
+def healthz():
+    """Readiness probe.
+    
+    The first call starts warm-up if it is not already running.
+    
+    Returns:
+        JSON response with either:
+        - ready: {'ready': True, 'warm_up_seconds': seconds}
+        - warming up: {'ready': False}, with status code 503
+        - warm-up failed: {'error': error_message, 'status': 503}, with status code 503
+    """
+    start_warm_up()
+    if not _warm_up_done.is_set():
+        return jsonify({'ready': False}), 503
+    if _warm_up_state['error']:
+        return jsonify({
+            'error': f"Warm-up failed: {_warm_up_state['error']}",
+            'status': 503
+        }), 503
+    return jsonify({'ready': True, 'warm_up_seconds': _warm_up_state['seconds']})
+
+@app.route('/metrics')
+def metrics():
+    """Report service counters.
+    
+    Returns:
+        JSON response with the single-flight counters of uploads and chats,
+        see SingleFlight.stats, the memory held by the current document,
+        see ChatService.memory_stats, the context strategies queries took,
+        see ChatService.query_stats, model and upstream health, see
+        ModelRouter.stats, and the admission pools, see AdmissionPool.stats
+    """
+    return jsonify({
+        'upload_single_flight': get_pdf_processor().single_flight.stats(),
+        'chat_single_flight': get_chat_service().single_flight.stats(),
+        'document_memory': get_chat_service().memory_stats(),
+        'context_strategies': get_chat_service().query_stats(),
+        'model_routing': get_chat_service().router.stats(),
+        'admission': {
+            'upload': upload_admission.stats(),
+            'chat': chat_admission.stats()
+        }
+    })
+
 @app.route('/upload', methods=['POST'])
+@admission_controlled(upload_admission)
 def upload_file():
     """Handle PDF file upload.
     
@@ -34,8 +174,9 @@ def upload_file():
     
     Returns:
         JSON response with either:
-        - success: {'message': success_message}
+        - success: {'message': success_message, 'skipped_pages': [{'page': n, 'reason': reason}]}
         - error: {'error': error_message, 'status': status_code}, with appropriate status code
+        - overloaded: status 503 with a Retry-After header, see admission_controlled
     """
     try:
         if 'file' not in request.files:
@@ -58,15 +199,15 @@ def upload_file():
             }), 400
         
         # Validate PDF
-        is_valid, error = pdf_processor.validate_pdf(file)
+        is_valid, error = get_pdf_processor().validate_pdf(file)
         if not is_valid:
             return jsonify({
                 'error': error,
                 'status': 400
             }), 400
         
-        # Extract text
-        text, error = pdf_processor.extract_text(file)
+        # Extract text and chunk metadata
+        text, chunks, skipped_pages, error = get_pdf_processor().extract_document(file)
         if error:
             return jsonify({
                 'error': error,
@@ -74,9 +215,12 @@ def upload_file():
             }), 500
         
         # Set context for chat service
-        chat_service.set_context(text)
+        get_chat_service().set_context(text, chunks)
         
-        return jsonify({'message': 'File uploaded and processed successfully'})
+        return jsonify({
+            'message': 'File uploaded and processed successfully',
+            'skipped_pages': skipped_pages
+        })
     except Exception as e:
         return jsonify({
             'error': 'An unexpected error occurred',
@@ -84,6 +228,7 @@ def upload_file():
         }), 500
 
 @app.route('/chat', methods=['POST'])
+@admission_controlled(chat_admission)
 def chat():
     """Handle chat interactions with input validation.
     
@@ -95,8 +240,9 @@ def chat():
     
     Returns:
         JSON response with either:
-        - success: {'response': response_text}
+        - success: {'response': response_text, 'citations': [chunk_metadata], 'pages': [page_numbers]}
         - error: {'error': error_message, 'status': status_code}, with appropriate status code
+        - overloaded: status 503 with a Retry-After header, see admission_controlled
     """
     try:
         # Validate request format
@@ -138,6 +284,7 @@ def chat():
             }), 400
         
         # Process valid query
+        chat_service = get_chat_service()
         response, error = chat_service.get_response(query.strip())
         if error:
             if error == "Rate limit exceeded. Please try again later.":
@@ -150,7 +297,10 @@ def chat():
                 'status': 500
             }), 500
         
-        return jsonify({'response': response})
+        citations = chat_service.get_citations(response)
+        pages = sorted({page for c in citations
+                        for page in range(c['page_start'], c['page_end'] + 1)})
+        return jsonify({'response': response, 'citations': citations, 'pages': pages})
     except Exception as e:
         # Handle unexpected errors
         return jsonify({
@@ -179,7 +329,7 @@ def feedback():
                 'status': 400
             }), 400
         
-        success, error = chat_service.save_feedback(data['feedback'])
+        success, error = get_chat_service().save_feedback(data['feedback'])
         if not success:
             return jsonify({
                 'error': error,
@@ -194,4 +344,6 @@ def feedback():
         }), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    if Config.WARM_UP_ON_START:
+        start_warm_up()
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,139 @@
+"""Static asset pipeline: fingerprinting, precompression and serving.
+
+Run ``python assets.py`` at build time. Every CSS/JS file under ``static/``
+is copied to ``static/dist/`` with a content hash in its name, next to
+``.gz`` (and ``.br`` when the ``brotli`` package is installed) variants, and
+``static/dist/manifest.json`` maps each source path to its hashed path.
+
+At runtime ``init_app`` rewrites ``url_for('static', filename=...)`` through
+the manifest and serves hashed files with immutable cache headers, picking a
+precompressed variant the client accepts. Without a manifest (e.g. in
+development) static files are served exactly as before.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Optional
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSET_EXTENSIONS = ('.css', '.js')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Preferred first; the extension is appended to the hashed file name
+_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+# PUBLIC_INTERFACE
+def build(static_dir: str) -> dict[str, str]:
+    """
+    Fingerprint and precompress the assets under a static folder.
+
+    Args:
+        static_dir: The Flask static folder
+
+    Returns:
+        dict: The manifest, source path -> hashed path (relative to static_dir)
+    """
+    dist = os.path.join(static_dir, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    brotli = _brotli()
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist]
+        for name in sorted(files):
+            if not name.endswith(ASSET_EXTENSIONS):
+                continue
+            source = os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
+            with open(os.path.join(root, name), 'rb') as f:
+                data = f.read()
+            stem, ext = os.path.splitext(source)
+            hashed = f"{DIST_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+            target = os.path.join(static_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            with open(target + '.gz', 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(target + '.br', 'wb') as f:
+                    f.write(brotli.compress(data))
+            manifest[source] = hashed
+    os.makedirs(dist, exist_ok=True)
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# PUBLIC_INTERFACE
+def load_manifest(static_dir: str) -> dict[str, str]:
+    """Return the asset manifest, or an empty one if assets were not built."""
+    try:
+        with open(os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# PUBLIC_INTERFACE
+def init_app(app) -> None:
+    """
+    Resolve static URLs through the manifest and serve hashed assets.
+
+    Args:
+        app: The Flask application
+    """
+    from flask import request, send_from_directory
+
+    manifest: Optional[dict] = None
+    hashed_files: set = set()
+
+    def get_manifest() -> dict:
+        nonlocal manifest, hashed_files
+        if manifest is None:
+            manifest = load_manifest(app.static_folder)
+            hashed_files = set(manifest.values())
+        return manifest
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = get_manifest().get(values['filename'], values['filename'])
+
+    default_static = app.view_functions['static']
+
+    def static(filename):
+        get_manifest()
+        if filename not in hashed_files:
+            return default_static(filename=filename)
+        accepted = request.accept_encodings
+        for encoding, suffix in _ENCODINGS:
+            if accepted[encoding] and os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+                response = send_from_directory(app.static_folder, filename + suffix,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(app.static_folder, filename)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static
+
+
+if __name__ == '__main__':
+    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    for source, hashed in build(static_folder).items():
+        print(f"{source} -> {hashed}")
@@ -0,0 +1,54 @@
+"""Compare PDF extraction engines on the synthetic corpus.
+
+Usage:
+    python benchmarks/bench_engines.py [--runs N]
+
+For every installed engine, with and without the pre-scan, prints the median
+extraction time per document and whether the extracted words match the
+ground truth.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_corpus import corpus  # noqa: E402
+from services.extraction_engines import ENGINES  # noqa: E402
+
+
+def expected_words(pages) -> list[list[str]]:
+    """Return the words each page spec should yield."""
+    return [" ".join(p).split() if isinstance(p, list) else [] for p in pages]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    docs = corpus()
+    print(f"{'engine':<10} {'prescan':<8} " + " ".join(f"{name:>18}" for name in docs))
+    for engine in ENGINES.values():
+        if not engine.available():
+            print(f"{engine.name:<10} (not installed)")
+            continue
+        for prescan in (False, True):
+            cells = []
+            for data, pages in docs.values():
+                times = []
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    result = engine.extract_pages(BytesIO(data), prescan=prescan)
+                    times.append(time.perf_counter() - started)
+                correct = [r.split() for r in result] == expected_words(pages)
+                cells.append(f"{statistics.median(times) * 1000:9.1f} ms {'ok' if correct else 'DIFF':>4}")
+            print(f"{engine.name:<10} {str(prescan):<8} " + " ".join(f"{c:>18}" for c in cells))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
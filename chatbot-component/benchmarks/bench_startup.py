@@ -0,0 +1,83 @@
+"""Startup-time benchmark: cold import cost and time to first healthy response.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--target SECONDS]
+
+Starts ``app.py`` as a fresh process on a free port, polls ``/healthz`` until
+it reports ready, and fails (exit code 1) if the median time to the first
+healthy response exceeds the target.
+"""
+import argparse
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TARGET_SECONDS = 2.0
+
+
+def free_port() -> int:
+    """Return a TCP port that is free on localhost."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    """Return the seconds a fresh interpreter needs to import the app."""
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR, check=True,
+                         capture_output=True, text=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def measure_first_healthy(timeout: float = 30.0) -> float:
+    """Return the seconds from process start to the first 200 from /healthz."""
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), WARM_UP_ON_START='true')
+    started = time.perf_counter()
+    # In its own process group, so the PDF extraction workers are stopped with it
+    proc = subprocess.Popen([sys.executable, 'app.py'], cwd=APP_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+    try:
+        url = f'http://127.0.0.1:{port}/healthz'
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f'/healthz not ready after {timeout}s')
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait()
+        # Let the workers exit before the next run starts
+        time.sleep(0.5)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target', type=float,
+                        default=float(os.environ.get('STARTUP_TARGET_SECONDS', DEFAULT_TARGET_SECONDS)))
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    healthy = [measure_first_healthy() for _ in range(args.runs)]
+    print(f"import app:            median {statistics.median(imports) * 1000:8.1f} ms")
+    print(f"first healthy /healthz: median {statistics.median(healthy) * 1000:8.1f} ms "
+          f"(target {args.target * 1000:.0f} ms)")
+    return 0 if statistics.median(healthy) <= args.target else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Synthetic PDF corpus for extraction benchmarks and tests.
+
+Documents are written directly as PDF bytes so no PDF writer library is
+needed. Each page is either a list of text lines, ``GRAPHICS`` (a page that
+only draws shapes, like a scanned image page) or ``BLANK`` (no content).
+"""
+import random
+from typing import Union
+
+GRAPHICS = "graphics"
+BLANK = "blank"
+
+PageSpec = Union[list, str]
+
+_WORDS = ("analysis data model results method system value performance report "
+          "section figure table sample process design review network storage "
+          "document request response service average latency throughput").split()
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _content(page: PageSpec) -> bytes:
+    if page == GRAPHICS:
+        return b"q 0.5 g 50 50 500 700 re f Q"
+    ops = ["BT", "/F1 11 Tf", "14 TL", "50 750 Td"]
+    for line in page:
+        ops.append(f"({_escape(line)}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+# PUBLIC_INTERFACE
+def make_pdf(pages: list[PageSpec]) -> bytes:
+    """
+    Build a PDF document.
+
+    Args:
+        pages: One spec per page: a list of text lines, GRAPHICS or BLANK
+
+    Returns:
+        bytes: The PDF file
+    """
+    objects: list[bytes] = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for pid, page in zip(page_ids, pages):
+        contents = "" if page == BLANK else f" /Contents {pid + 1} 0 R"
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                        f"/Resources << /Font << /F1 3 0 R >> >>{contents} >>").encode())
+        data = b"" if page == BLANK else _content(page)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# PUBLIC_INTERFACE
+def text_page(rng: random.Random, lines: int = 40, words: int = 10) -> list:
+    """Return a page spec of random text lines."""
+    return [" ".join(rng.choice(_WORDS) for _ in range(words)) for _ in range(lines)]
+
+
+# PUBLIC_INTERFACE
+def corpus(seed: int = 0) -> dict[str, tuple[bytes, list[PageSpec]]]:
+    """
+    Return the benchmark corpus keyed by document name.
+
+    The mix covers short and long text documents and documents where most
+    pages carry no text, which is where the pre-scan pays off.
+
+    Args:
+        seed: Random seed for the generated text
+
+    Returns:
+        dict: name -> (pdf_bytes, page_specs)
+    """
+    rng = random.Random(seed)
+    docs = {
+        "short-text": [text_page(rng) for _ in range(3)],
+        "long-text": [text_page(rng) for _ in range(200)],
+        "mostly-graphics": [text_page(rng) if i % 10 == 0 else GRAPHICS for i in range(200)],
+        "sparse-blank": [text_page(rng) if i % 4 == 0 else BLANK for i in range(100)],
+    }
+    return {name: (make_pdf(pages), pages) for name, pages in docs.items()}
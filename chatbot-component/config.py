@@ -11,8 +11,67 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     ALLOWED_EXTENSIONS = {'pdf'}
     
+    # Admission control: separate pools so CPU-heavy uploads never starve chat.
+    # Requests queued longer than *_MAX_QUEUE_SECONDS are shed with 503 + Retry-After.
+    UPLOAD_MAX_CONCURRENT = int(os.environ.get('UPLOAD_MAX_CONCURRENT', os.cpu_count() or 2))
+    UPLOAD_MAX_QUEUE_SECONDS = float(os.environ.get('UPLOAD_MAX_QUEUE_SECONDS', 10))
+    UPLOAD_MAX_QUEUE = int(os.environ.get('UPLOAD_MAX_QUEUE', 16))
+    CHAT_MAX_CONCURRENT = int(os.environ.get('CHAT_MAX_CONCURRENT', 32))
+    CHAT_MAX_QUEUE_SECONDS = float(os.environ.get('CHAT_MAX_QUEUE_SECONDS', 5))
+    CHAT_MAX_QUEUE = int(os.environ.get('CHAT_MAX_QUEUE', 128))
+    # Priority lanes per X-API-Key header, e.g. "key-a:10,key-b:5" (default priority 0)
+    API_KEY_PRIORITIES = os.environ.get('API_KEY_PRIORITIES', '')
+    
+    # PDF extraction configuration (engines: pypdf2, pypdf, pdfminer)
+    PDF_ENGINE = os.environ.get('PDF_ENGINE', 'pypdf2')
+    PDF_LARGE_ENGINE = os.environ.get('PDF_LARGE_ENGINE') or PDF_ENGINE
+    PDF_LARGE_FILE_BYTES = int(os.environ.get('PDF_LARGE_FILE_BYTES', 2 * 1024 * 1024))
+    # Skip pages without text operators. Off by default: with PyPDF2 such pages are already
+    # cheap to extract, so the scan saves nothing measurable (see benchmarks/bench_engines.py)
+    PDF_PRESCAN = os.environ.get('PDF_PRESCAN', 'false').lower() == 'true'
+    
+    # PDF extraction budgets, enforced in supervised worker processes
+    PDF_SUPERVISED = os.environ.get('PDF_SUPERVISED', 'true').lower() == 'true'
+    PDF_PAGE_TIMEOUT = float(os.environ.get('PDF_PAGE_TIMEOUT', 5))  # seconds per page
+    PDF_DOCUMENT_TIMEOUT = float(os.environ.get('PDF_DOCUMENT_TIMEOUT', 60))  # seconds per document
+    PDF_WORKER_CPU_SECONDS = int(os.environ.get('PDF_WORKER_CPU_SECONDS', 30))
+    PDF_WORKER_MEMORY_MB = int(os.environ.get('PDF_WORKER_MEMORY_MB', 512))
+    # Idle worker processes kept warm between uploads, and documents per worker before it is recycled
+    PDF_WORKERS = int(os.environ.get('PDF_WORKERS', UPLOAD_MAX_CONCURRENT))
+    PDF_WORKER_MAX_JOBS = int(os.environ.get('PDF_WORKER_MAX_JOBS', 100))
+    PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 2000))
+    PDF_MAX_TEXT_CHARS = int(os.environ.get('PDF_MAX_TEXT_CHARS', 20 * 1000 * 1000))
+    
+    # Chunking configuration
+    CHUNK_SIZE = int(os.environ.get('CHUNK_SIZE', 1000))  # characters per chunk
+    CHUNK_STORE_COMPRESSION = os.environ.get('CHUNK_STORE_COMPRESSION', 'zlib')  # none, zlib or zstd
+    CHUNK_STORE_BLOCK_BYTES = int(os.environ.get('CHUNK_STORE_BLOCK_BYTES', 64 * 1024))
+    
     # OpenAI configuration
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    OPENAI_API_BASE = os.environ.get('OPENAI_API_BASE', 'https://api.openai.com/v1')
+    # Optional secondary OpenAI-compatible endpoint, used on timeouts and upstream errors
+    OPENAI_FALLBACK_API_BASE = os.environ.get('OPENAI_FALLBACK_API_BASE')
+    OPENAI_FALLBACK_API_KEY = os.environ.get('OPENAI_FALLBACK_API_KEY')
+    UPSTREAM_TIMEOUT = float(os.environ.get('UPSTREAM_TIMEOUT', 30))  # seconds per completion
+    CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+    CIRCUIT_RESET_SECONDS = float(os.environ.get('CIRCUIT_RESET_SECONDS', 30))
+    
+    # Model routing by prompt size and query type
+    CHAT_MODEL = os.environ.get('CHAT_MODEL', 'gpt-3.5-turbo')
+    CHAT_MODEL_FAST = os.environ.get('CHAT_MODEL_FAST') or CHAT_MODEL
+    CHAT_MODEL_LARGE_CONTEXT = os.environ.get('CHAT_MODEL_LARGE_CONTEXT', 'gpt-3.5-turbo-16k')
+    FAST_MODEL_MAX_PROMPT_TOKENS = int(os.environ.get('FAST_MODEL_MAX_PROMPT_TOKENS', 1000))
+    
+    # Context selection: whole document if it fits, otherwise top-k chunks or map-reduce.
+    # MODEL_CONTEXT_TOKENS is the context window of CHAT_MODEL.
+    MODEL_CONTEXT_TOKENS = int(os.environ.get('MODEL_CONTEXT_TOKENS', 4096))
+    RESPONSE_RESERVE_TOKENS = int(os.environ.get('RESPONSE_RESERVE_TOKENS', 512))
+    TOP_K_CHUNKS = int(os.environ.get('TOP_K_CHUNKS', 8))
+    MAP_REDUCE_WORKERS = int(os.environ.get('MAP_REDUCE_WORKERS', 4))  # parallel sub-calls
+    # Upper bound on model calls for one map-reduce query, map and reduce steps included
+    MAP_REDUCE_MAX_CALLS = int(os.environ.get('MAP_REDUCE_MAX_CALLS', 16))
+    QUERY_LOG_SIZE = 100
     
-    # Ensure upload directory exists
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
\ No newline at end of file
+    # Startup configuration: warm heavy modules in the background at boot
+    WARM_UP_ON_START = os.environ.get('WARM_UP_ON_START', 'true').lower() == 'true'
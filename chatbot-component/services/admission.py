@@ -0,0 +1,141 @@
+"""Admission control: bounded concurrency with queue-time-based load shedding."""
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class Rejected(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request shed ({reason}); retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionPool:
+    """
+    Admits at most ``max_concurrent`` requests at a time.
+
+    Requests beyond that wait in a queue ordered by priority (higher first),
+    then arrival. A request that has waited ``max_queue_seconds`` without
+    being admitted is shed, as is any request arriving while ``max_queue``
+    requests are already waiting, so under overload callers fail fast with
+    a retry hint instead of piling up until the proxy times out.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue_seconds: float, max_queue: int):
+        """Initialize an empty pool."""
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue_seconds = max_queue_seconds
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._waiting: list[list] = []  # heap of [-priority, sequence]
+        self._sequence = itertools.count()
+        self._active = 0
+        self._admitted = 0
+        self._shed: dict[str, int] = {}
+        self._wait_seconds = 0.0
+        self._service_seconds = 1.0  # moving average, seeds the first Retry-After
+
+    # PUBLIC_INTERFACE
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait, from queue depth and average service time."""
+        backlog = (len(self._waiting) + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(self._service_seconds * backlog))
+
+    def _shed_request(self, reason: str) -> Rejected:
+        self._shed[reason] = self._shed.get(reason, 0) + 1
+        return Rejected(reason, self.retry_after())
+
+    # PUBLIC_INTERFACE
+    @contextmanager
+    def admit(self, priority: int = 0) -> Iterator[None]:
+        """
+        Hold a slot in the pool for the duration of the block.
+
+        Args:
+            priority: Queue priority, higher is admitted first
+
+        Raises:
+            Rejected: If the queue is full or the request waited too long
+        """
+        started = time.monotonic()
+        with self._cond:
+            if self._waiting or self._active >= self.max_concurrent:
+                if len(self._waiting) >= self.max_queue:
+                    raise self._shed_request('queue_full')
+                ticket = [-priority, next(self._sequence)]
+                heapq.heappush(self._waiting, ticket)
+                deadline = started + self.max_queue_seconds
+                while not (self._waiting[0] is ticket and self._active < self.max_concurrent):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiting.remove(ticket)
+                        heapq.heapify(self._waiting)
+                        self._cond.notify_all()
+                        raise self._shed_request('queue_timeout')
+                    self._cond.wait(remaining)
+                heapq.heappop(self._waiting)
+                # The next waiter may also fit if several slots are free
+                self._cond.notify_all()
+            self._active += 1
+            self._admitted += 1
+            admitted_at = time.monotonic()
+            self._wait_seconds += admitted_at - started
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._service_seconds += 0.2 * ((time.monotonic() - admitted_at) - self._service_seconds)
+                self._cond.notify_all()
+
+    # PUBLIC_INTERFACE
+    def stats(self) -> dict:
+        """
+        Return pool counters.
+
+        Returns:
+            dict: active, waiting, admitted, shed (per reason), average wait
+            and service time in milliseconds, and the configured limits
+        """
+        with self._cond:
+            return {
+                'active': self._active,
+                'waiting': len(self._waiting),
+                'admitted': self._admitted,
+                'shed': dict(self._shed),
+                'avg_wait_ms': round(self._wait_seconds / self._admitted * 1000, 1) if self._admitted else 0.0,
+                'avg_service_ms': round(self._service_seconds * 1000, 1),
+                'max_concurrent': self.max_concurrent,
+                'max_queue_seconds': self.max_queue_seconds,
+            }
+
+
+# PUBLIC_INTERFACE
+def parse_priorities(spec: str) -> dict[str, int]:
+    """
+    Parse API key priorities from a ``key:priority,key:priority`` string.
+
+    Args:
+        spec: The configured string, may be empty
+
+    Returns:
+        dict: API key -> priority
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    priorities = {}
+    for entry in filter(None, (e.strip() for e in spec.split(','))):
+        key, _, priority = entry.rpartition(':')
+        if not key:
+            raise ValueError(f"Invalid API key priority entry: {entry}")
+        priorities[key] = int(priority)
+    return priorities
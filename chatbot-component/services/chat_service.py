@@ -1,30 +1,96 @@
 """Chat service for handling AI-powered responses."""
+import hashlib
 import os
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import time
 from datetime import datetime, timedelta
-import openai
 from config import Config
+from services import context_policy
+from services.chunk_store import ChunkStore
+from services.chunk_table import ChunkTable
+from services.model_router import ANSWER, EXTRACT, ModelRouter
+from services.single_flight import SingleFlight
+from services.tokens import count_tokens
+
+# Tokens of the system prompt wrapper and of each "[chunk N | p. X]" label
+_PROMPT_OVERHEAD_TOKENS = 32
+_LABEL_TOKENS = 12
+
+_MAP_PROMPT = ("Using only the context, write down everything that helps answer the "
+               "question below, keeping the [chunk N] citations. Reply NONE if nothing "
+               "in the context is relevant.\n\nQuestion: {query}")
+_REDUCE_PROMPT = ("Merge the notes into one shorter set of notes that helps answer the "
+                  "question below, keeping the [chunk N] citations.\n\nQuestion: {query}")
+_NOTES_HEADER = "Notes from the document, with their [chunk N] citations:\n\n"
 
 class ChatService:
     """Handles chat interactions using OpenAI API."""
     
     def __init__(self):
-        """Initialize the chat service with OpenAI API key."""
-        openai.api_key = Config.OPENAI_API_KEY
-        self.context = ""
+        """Initialize the chat service; the OpenAI client is loaded on first use."""
+        self.router = ModelRouter.from_config(Config)
+        self.store: Optional[ChunkStore] = None
+        self.chunks: Optional[ChunkTable] = None
+        self.chunk_tokens = array('I')  # prompt cost of each store piece
+        self.term_index: Optional[context_policy.TermIndex] = None  # BM25 index of the chunks
+        self._context_digest = ""
+        # Identical questions against the same context share one completion
+        self.single_flight = SingleFlight()
         self.request_timestamps = []
         self.rate_limit = 10  # requests per minute
+        # Which context strategy each query took, with its latency and token cost
+        self._stats_lock = threading.Lock()
+        self.query_log = deque(maxlen=Config.QUERY_LOG_SIZE)
+        self._strategy_totals: dict[str, dict] = {}
     
     # PUBLIC_INTERFACE
-    def set_context(self, text: str) -> None:
+    def set_context(self, text: str, chunks: Optional[ChunkTable] = None) -> None:
         """
         Set the context for chat responses from PDF content.
         
         Args:
             text: The extracted text from PDF to use as context
+            chunks: Optional chunk metadata for the text, enables citations
+        """
+        # Cut the text at chunk starts so the store pieces cover it exactly
+        starts = list(chunks.char_start) if chunks is not None and len(chunks) else [0]
+        starts[0] = 0
+        pieces = [text[a:b] for a, b in zip(starts, starts[1:] + [len(text)])]
+        label_tokens = _LABEL_TOKENS if chunks is not None else 0
+        self.chunk_tokens = array('I', (count_tokens(p) + label_tokens for p in pieces))
+        # Term statistics are computed once here; queries only score against them
+        self.term_index = (context_policy.TermIndex(chunks.chunk_text(i, text) for i in range(len(chunks)))
+                           if chunks is not None and len(chunks) else None)
+        self.store = ChunkStore(pieces, Config.CHUNK_STORE_COMPRESSION, Config.CHUNK_STORE_BLOCK_BYTES)
+        self.chunks = chunks
+        self._context_digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    @property
+    def context(self) -> str:
+        """The full document text, decompressed from the chunk store."""
+        return self.store.text() if self.store is not None else ""
+    
+    # PUBLIC_INTERFACE
+    def memory_stats(self) -> dict:
         """
-        self.context = text
+        Report the memory held by the current document.
+        
+        Returns:
+            dict: ChunkStore.stats of the document text plus chunk_table_bytes,
+            or an empty dict if no document is loaded
+        """
+        if self.store is None:
+            return {}
+        stats = self.store.stats()
+        if self.chunks is not None:
+            arrays = (self.chunks.page_start, self.chunks.page_end, self.chunks.char_start,
+                      self.chunks.char_end, self.chunks.heading_id)
+            stats['chunk_table_bytes'] = sum(len(a) * a.itemsize for a in arrays)
+        return stats
     
     # PUBLIC_INTERFACE
     def check_rate_limit(self) -> bool:
@@ -46,13 +112,16 @@ class ChatService:
         return True
 
     # PUBLIC_INTERFACE
-    def generate_response(self, query: str, context: str) -> str:
+    def generate_response(self, query: str, context: str, query_type: str = ANSWER) -> str:
         """
         Generate a response using OpenAI's API.
         
+        The model and upstream are chosen by the router, see ModelRouter.
+        
         Args:
             query: The user's question
             context: The context from PDF
+            query_type: ANSWER, or EXTRACT for map-step sub-calls
             
         Returns:
             str: The generated response
@@ -60,14 +129,10 @@ class ChatService:
         Raises:
             Exception: If there's an error in generating the response
         """
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": f"Context from PDF: {context}"},
-                {"role": "user", "content": query}
-            ]
-        )
-        return response.choices[0].message.content
+        return self.router.complete([
+            {"role": "system", "content": f"Context from PDF: {context}"},
+            {"role": "user", "content": query}
+        ], query_type)
 
     # PUBLIC_INTERFACE
     def get_response(self, query: str) -> tuple[str, Optional[str]]:
@@ -83,17 +148,158 @@ class ChatService:
             - error_message: Error message if any, None otherwise
         """
         try:
-            if not self.context:
+            if self.store is None or not self.store.raw_bytes:
                 return "", "No context available. Please upload a PDF first."
             
             if not self.check_rate_limit():
                 return "", "Rate limit exceeded. Please try again later."
             
-            response = self.generate_response(query, self.context)
+            key = (self._context_digest, query)
+            response = self.single_flight.do(key, self._answer, query)
             return response, None
         except Exception as e:
             return "", f"Error generating response: {str(e)}"
     
+    def _answer(self, query: str) -> str:
+        """
+        Answer the query with the cheapest context strategy that fits.
+        
+        Documents that fit the model's context window are sent whole. For
+        larger ones, whole-document questions (summaries) are answered by
+        map-reduce over batches of chunks with parallel sub-calls; all other
+        questions get the top-ranked chunks that fit, or the leading chunks
+        if no chunk matches the query terms. The strategy taken, its latency
+        and its token cost are recorded per query.
+        """
+        started = time.perf_counter()
+        store, chunks, tokens, term_index = self.store, self.chunks, self.chunk_tokens, self.term_index
+        budget = (Config.MODEL_CONTEXT_TOKENS - Config.RESPONSE_RESERVE_TOKENS
+                  - _PROMPT_OVERHEAD_TOKENS - count_tokens(query))
+        calls = []
+        
+        def call(prompt: str, context: str, query_type: str = ANSWER) -> str:
+            response = self.generate_response(prompt, context, query_type)
+            calls.append((count_tokens(prompt) + count_tokens(context) + _PROMPT_OVERHEAD_TOKENS,
+                          count_tokens(response)))
+            return response
+        
+        if chunks is None or not len(chunks):
+            strategy = context_policy.FULL
+            response = call(query, store.text())
+            self._record(strategy, started, calls, len(store), len(store))
+            return response
+        
+        def text_of(chunk_id: int) -> str:
+            return store.get(chunk_id)[:chunks.char_end[chunk_id] - chunks.char_start[chunk_id]]
+        
+        strategy = context_policy.choose_strategy(sum(tokens), budget, query)
+        if strategy == context_policy.FULL:
+            response = call(query, chunks.labelled_context(text_of))
+            chunks_read = len(chunks)
+        elif strategy == context_policy.TOP_K:
+            ranked = term_index.rank(query)
+            selected = context_policy.pack(ranked, tokens, budget, Config.TOP_K_CHUNKS)
+            if not selected:
+                # Nothing matched the query terms (stopwords, greetings, typos);
+                # fall back to the start of the document rather than all of it
+                selected = context_policy.pack(range(len(chunks)), tokens, budget, Config.TOP_K_CHUNKS)
+            response = call(query, chunks.labelled_context(text_of, selected))
+            chunks_read = len(selected)
+        else:
+            response, chunks_read = self._map_reduce(query, chunks, text_of, tokens, budget, call)
+        self._record(strategy, started, calls, chunks_read, len(chunks))
+        return response
+    
+    def _map_reduce(self, query, chunks, text_of, tokens, budget, call) -> tuple[str, int]:
+        """
+        Extract notes from batches of chunks in parallel, then answer from the notes.
+        
+        Returns the answer and the number of chunks the map step read.
+        
+        At most Config.MAP_REDUCE_MAX_CALLS model calls are made. Half of them
+        are available to the map step; a document needing more batches than
+        that is sampled evenly (see context_policy.batches). Notes that do not
+        fit one call are merged in further rounds until they do.
+        """
+        max_calls = max(Config.MAP_REDUCE_MAX_CALLS, 2)
+        groups = context_policy.batches(tokens, budget, max_calls // 2)
+        chunks_read = sum(len(ids) for ids in groups)
+        notes = self._extract(_MAP_PROMPT.format(query=query),
+                              [chunks.labelled_context(text_of, ids) for ids in groups], call)
+        calls_left = max_calls - len(groups) - 1  # keep one for the answer
+        while True:
+            note_tokens = [count_tokens(n) for n in notes]
+            if sum(note_tokens) <= budget:
+                break
+            groups = context_policy.batches(note_tokens, budget)
+            if len(groups) >= len(notes) or len(groups) > calls_left:
+                # Merging cannot make progress within the call budget
+                notes = [notes[i] for i in context_policy.pack(range(len(notes)), note_tokens, budget)]
+                break
+            notes = self._extract(_REDUCE_PROMPT.format(query=query),
+                                  [_NOTES_HEADER + "\n\n".join(notes[i] for i in ids) for ids in groups], call)
+            calls_left -= len(groups)
+        return call(query, _NOTES_HEADER + "\n\n".join(notes)), chunks_read
+    
+    def _extract(self, prompt: str, contexts: list[str], call) -> list[str]:
+        """Run EXTRACT sub-calls over the contexts in parallel and keep the non-empty notes."""
+        with ThreadPoolExecutor(max_workers=min(Config.MAP_REDUCE_WORKERS, len(contexts))) as pool:
+            notes = list(pool.map(lambda context: call(prompt, context, EXTRACT), contexts))
+        return [n.strip() for n in notes if n.strip() and n.strip().upper() != 'NONE']
+    
+    def _record(self, strategy: str, started: float, calls: list, chunks_read: int, chunks_total: int) -> None:
+        """Record the strategy, coverage, latency and token cost of one answered query."""
+        entry = {
+            'strategy': strategy,
+            'chunks_read': chunks_read,
+            'chunks_total': chunks_total,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+            'calls': len(calls),
+            'prompt_tokens': sum(c[0] for c in calls),
+            'completion_tokens': sum(c[1] for c in calls),
+        }
+        with self._stats_lock:
+            self.query_log.append(entry)
+            totals = self._strategy_totals.setdefault(
+                strategy, {'queries': 0, 'latency_ms': 0.0, 'calls': 0,
+                           'prompt_tokens': 0, 'completion_tokens': 0})
+            totals['queries'] += 1
+            for key in ('latency_ms', 'calls', 'prompt_tokens', 'completion_tokens'):
+                totals[key] += entry[key]
+    
+    # PUBLIC_INTERFACE
+    def query_stats(self) -> dict:
+        """
+        Report which context strategies answered queries and what they cost.
+        
+        Returns:
+            dict: 'strategies' with totals per strategy (queries, latency_ms,
+            calls, prompt_tokens, completion_tokens) and 'recent' with the
+            last queries, oldest first; each also reports chunks_read out of
+            chunks_total, which is below the total when map-reduce sampled
+            the document
+        """
+        with self._stats_lock:
+            return {
+                'strategies': {name: dict(totals) for name, totals in self._strategy_totals.items()},
+                'recent': list(self.query_log),
+            }
+    
+    # PUBLIC_INTERFACE
+    def get_citations(self, response: str) -> list[dict]:
+        """
+        Resolve the chunks cited in a response to their page metadata.
+        
+        Args:
+            response: A response returned by get_response
+            
+        Returns:
+            list: One metadata dict per cited chunk, see ChunkTable.row
+        """
+        if self.chunks is None:
+            return []
+        return [self.chunks.row(i) for i in self.chunks.citations(response)]
+    
     # PUBLIC_INTERFACE
     def save_feedback(self, feedback: str) -> tuple[bool, Optional[str]]:
         """
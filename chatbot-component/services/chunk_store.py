@@ -0,0 +1,152 @@
+"""Compact, optionally compressed in-memory storage of chunk text."""
+import sys
+import zlib
+from array import array
+from typing import Iterable, Optional
+
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+class ChunkStore:
+    """
+    Immutable text of a document's chunks, packed into a single buffer.
+
+    All chunk text is encoded as UTF-8 and concatenated; ``offsets`` holds
+    the byte position of each chunk boundary. With compression enabled the
+    concatenation is cut into blocks of about ``block_bytes`` (always at
+    chunk boundaries), each block is compressed on its own and only the
+    blocks a read touches are decompressed. The most recently decompressed
+    block is kept, so reading chunks in order decompresses each block once.
+
+    Pieces are stored verbatim, so ``text()`` returns exactly the
+    concatenation of the pieces the store was built from.
+    """
+
+    CODECS = ('none', 'zlib', 'zstd')
+
+    def __init__(self, pieces: Iterable[str], compression: str = 'zlib', block_bytes: int = 64 * 1024):
+        """
+        Pack chunk texts.
+
+        Args:
+            pieces: Chunk texts in document order
+            compression: 'none', 'zlib' or 'zstd' (falls back to zlib if
+                the zstandard package is not installed)
+            block_bytes: Target uncompressed size of a compression block
+
+        Raises:
+            ValueError: If the compression codec is unknown
+        """
+        if compression not in self.CODECS:
+            raise ValueError(f"Unknown chunk store compression: {compression}")
+        if compression == 'zstd' and _zstd() is None:
+            compression = 'zlib'
+        self.compression = compression
+
+        raw = bytearray()
+        # Absolute byte offset of every chunk boundary, len(pieces) + 1 entries
+        offsets = array('Q', [0])
+        for piece in pieces:
+            raw += piece.encode('utf-8')
+            offsets.append(len(raw))
+        self.raw_bytes = len(raw)
+
+        # Chunk i lives in block chunk_block[i]; block j covers raw bytes
+        # block_start[j]:block_start[j + 1] and compressed bytes
+        # block_offsets[j]:block_offsets[j + 1] of the buffer.
+        self.offsets = offsets
+        self.chunk_block = array('I')
+        self.block_start = array('Q', [0])
+        self.block_offsets = array('Q', [0])
+        if compression == 'none':
+            self.chunk_block.extend([0] * (len(offsets) - 1))
+            self.block_start.append(len(raw))
+            self.block_offsets.append(len(raw))
+            self._buffer = bytes(raw)
+        else:
+            compressor = (zlib.compress if compression == 'zlib'
+                          else _zstd().ZstdCompressor().compress)
+            buffer = bytearray()
+            block = 0
+            for i in range(len(offsets) - 1):
+                if offsets[i] - self.block_start[block] >= block_bytes:
+                    self._close_block(raw, buffer, compressor, offsets[i])
+                    block += 1
+                self.chunk_block.append(block)
+            self._close_block(raw, buffer, compressor, len(raw))
+            self._buffer = bytes(buffer)
+        self._cached: tuple[int, Optional[bytes]] = (-1, None)
+
+    def _close_block(self, raw: bytearray, buffer: bytearray, compressor, end: int) -> None:
+        buffer += compressor(bytes(raw[self.block_start[-1]:end]))
+        self.block_start.append(end)
+        self.block_offsets.append(len(buffer))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _block(self, block: int) -> bytes:
+        """Return the uncompressed bytes of a block."""
+        cached_block, data = self._cached
+        if cached_block == block:
+            return data
+        data = self._buffer[self.block_offsets[block]:self.block_offsets[block + 1]]
+        if self.compression == 'zlib':
+            data = zlib.decompress(data)
+        elif self.compression == 'zstd':
+            data = _zstd().ZstdDecompressor().decompress(
+                data, max_output_size=self.block_start[block + 1] - self.block_start[block])
+        self._cached = (block, data)
+        return data
+
+    # PUBLIC_INTERFACE
+    def get(self, chunk_id: int) -> str:
+        """
+        Return the text of one chunk, decompressing only its block.
+
+        Args:
+            chunk_id: Index of the chunk
+
+        Returns:
+            str: The chunk text
+        """
+        block = self.chunk_block[chunk_id]
+        base = self.block_start[block]
+        data = self._block(block)
+        return data[self.offsets[chunk_id] - base:self.offsets[chunk_id + 1] - base].decode('utf-8')
+
+    # PUBLIC_INTERFACE
+    def text(self) -> str:
+        """Return the concatenation of all chunks."""
+        return b"".join(self._block(b) for b in range(len(self.block_start) - 1)).decode('utf-8')
+
+    # PUBLIC_INTERFACE
+    @property
+    def nbytes(self) -> int:
+        """Resident size of the store in bytes, excluding the cached decompressed block."""
+        arrays = (self.offsets, self.chunk_block, self.block_start, self.block_offsets)
+        return (sys.getsizeof(self) + sys.getsizeof(self._buffer)
+                + sum(a.buffer_info()[1] * a.itemsize for a in arrays))
+
+    # PUBLIC_INTERFACE
+    def stats(self) -> dict:
+        """
+        Return size statistics.
+
+        Returns:
+            dict: chunks, blocks, compression, raw_bytes (UTF-8 text size)
+            and bytes (resident size, see nbytes)
+        """
+        return {
+            'chunks': len(self),
+            'blocks': len(self.block_start) - 1,
+            'compression': self.compression,
+            'raw_bytes': self.raw_bytes,
+            'bytes': self.nbytes,
+        }
@@ -0,0 +1,240 @@
+"""Compact per-chunk metadata for extracted PDF text."""
+import re
+from array import array
+from bisect import bisect_right
+from typing import Callable, Iterable, Optional
+
+# Lines that look like section headings: numbered ("2.1 Methods"),
+# upper-case ("INTRODUCTION") or short title-case lines without a full stop.
+_NUMBERED_HEADING = re.compile(r'^(\d+(\.\d+)*\.?|[IVXLC]+\.)\s+\S.*$')
+_CITATION = re.compile(r'\[chunk (\d+)[^\]]*\]', re.IGNORECASE)
+
+
+def detect_heading(line: str) -> Optional[str]:
+    """
+    Return the line as a heading if it looks like one, otherwise None.
+
+    Args:
+        line: A single line of extracted page text
+
+    Returns:
+        Optional[str]: The cleaned heading text, or None
+    """
+    line = line.strip()
+    if not line or len(line) > 80 or line.endswith(('.', ',', ';', ':')):
+        return None
+    letters = [c for c in line if c.isalpha()]
+    # Page numbers, dates and amounts ("7", "- 12 -", "$ 1,000") are not headings
+    if len(letters) < 3:
+        return None
+    if _NUMBERED_HEADING.match(line):
+        return line
+    if all(c.isupper() for c in letters):
+        return line
+    words = line.split()
+    if 1 <= len(words) <= 8 and all(w[0].isupper() or not w[0].isalpha() for w in words):
+        return line
+    return None
+
+
+class ChunkTable:
+    """
+    Per-chunk metadata stored as parallel arrays.
+
+    Row ``i`` describes chunk ``i`` of the document text: the 1-based page
+    range it spans, its ``[start, end)`` character offsets into the text
+    returned by ``PDFProcessor.extract_text`` and the nearest preceding
+    section heading. Headings are interned so repeated sections cost one
+    small integer per chunk.
+    """
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.page_start = array('I')
+        self.page_end = array('I')
+        self.char_start = array('I')
+        self.char_end = array('I')
+        self.heading_id = array('i')
+        self.headings: list[str] = []
+        self._heading_index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.char_start)
+
+    # PUBLIC_INTERFACE
+    def append(self, page_start: int, page_end: int, char_start: int, char_end: int,
+               heading: Optional[str] = None) -> int:
+        """
+        Append a chunk row.
+
+        Args:
+            page_start: First 1-based page the chunk covers
+            page_end: Last 1-based page the chunk covers
+            char_start: Offset of the first character in the document text
+            char_end: Offset one past the last character
+            heading: Section heading in effect at the chunk start, if any
+
+        Returns:
+            int: The new chunk ID
+        """
+        if heading is None:
+            hid = -1
+        else:
+            hid = self._heading_index.get(heading)
+            if hid is None:
+                hid = len(self.headings)
+                self.headings.append(heading)
+                self._heading_index[heading] = hid
+        self.page_start.append(page_start)
+        self.page_end.append(page_end)
+        self.char_start.append(char_start)
+        self.char_end.append(char_end)
+        self.heading_id.append(hid)
+        return len(self) - 1
+
+    # PUBLIC_INTERFACE
+    def heading(self, chunk_id: int) -> Optional[str]:
+        """Return the section heading for a chunk, or None."""
+        hid = self.heading_id[chunk_id]
+        return self.headings[hid] if hid >= 0 else None
+
+    # PUBLIC_INTERFACE
+    def row(self, chunk_id: int) -> dict:
+        """
+        Return the metadata of one chunk as a JSON-serializable dict.
+
+        Args:
+            chunk_id: The chunk ID
+
+        Returns:
+            dict: chunk_id, page_start, page_end, char_start, char_end, heading
+        """
+        return {
+            'chunk_id': chunk_id,
+            'page_start': self.page_start[chunk_id],
+            'page_end': self.page_end[chunk_id],
+            'char_start': self.char_start[chunk_id],
+            'char_end': self.char_end[chunk_id],
+            'heading': self.heading(chunk_id),
+        }
+
+    # PUBLIC_INTERFACE
+    def chunk_text(self, chunk_id: int, text: str) -> str:
+        """Slice the text of a chunk out of the document text."""
+        return text[self.char_start[chunk_id]:self.char_end[chunk_id]]
+
+    # PUBLIC_INTERFACE
+    def chunks_for_pages(self, first: int, last: int) -> list[int]:
+        """
+        Return the IDs of chunks overlapping a page range.
+
+        Args:
+            first: First 1-based page, inclusive
+            last: Last 1-based page, inclusive
+
+        Returns:
+            list[int]: Matching chunk IDs in document order
+        """
+        return [i for i in range(len(self))
+                if self.page_start[i] <= last and self.page_end[i] >= first]
+
+    # PUBLIC_INTERFACE
+    def labelled_context(self, text_of: Callable[[int], str],
+                         chunk_ids: Optional[Iterable[int]] = None) -> str:
+        """
+        Render chunks with a citation label before each one.
+
+        Args:
+            text_of: Returns the text of a chunk ID
+            chunk_ids: Chunks to include, all chunks if omitted
+
+        Returns:
+            str: Context for the model, instructing it to cite chunk labels
+        """
+        parts = ["Cite the chunks you use as [chunk N]."]
+        for i in (range(len(self)) if chunk_ids is None else chunk_ids):
+            if self.page_start[i] == self.page_end[i]:
+                pages = f"p. {self.page_start[i]}"
+            else:
+                pages = f"pp. {self.page_start[i]}-{self.page_end[i]}"
+            heading = self.heading(i)
+            label = f"[chunk {i} | {pages}" + (f" | {heading}]" if heading else "]")
+            parts.append(f"{label}\n{text_of(i)}")
+        return "\n\n".join(parts)
+
+    # PUBLIC_INTERFACE
+    def citations(self, response: str) -> list[int]:
+        """
+        Parse the chunk IDs cited in a model response.
+
+        Args:
+            response: The generated answer
+
+        Returns:
+            list[int]: Valid cited chunk IDs, deduplicated, in citation order
+        """
+        seen = []
+        for match in _CITATION.finditer(response):
+            chunk_id = int(match.group(1))
+            if chunk_id < len(self) and chunk_id not in seen:
+                seen.append(chunk_id)
+        return seen
+
+
+def build_chunk_table(pages: list[str], chunk_size: int = 1000) -> tuple[str, ChunkTable]:
+    """
+    Join page texts and split the result into page-aware chunks.
+
+    Chunks break on whitespace near ``chunk_size`` characters and may span
+    a page boundary; each row records the pages it touches.
+
+    Args:
+        pages: Extracted text of each page, in page order (may be empty)
+        chunk_size: Target chunk length in characters
+
+    Returns:
+        tuple: (text, table)
+        - text: Non-empty pages joined with newlines
+        - table: The chunk metadata for ``text``
+    """
+    texts = []
+    page_numbers = []
+    page_offsets = []
+    headings: list[tuple[int, str]] = []
+    offset = 0
+    for number, page_text in enumerate(pages, start=1):
+        page_text = (page_text or "").strip()
+        if not page_text:
+            continue
+        page_offsets.append(offset)
+        page_numbers.append(number)
+        line_offset = offset
+        for line in page_text.split("\n"):
+            heading = detect_heading(line)
+            if heading:
+                headings.append((line_offset, heading))
+            line_offset += len(line) + 1
+        texts.append(page_text)
+        offset += len(page_text) + 1
+    text = "\n".join(texts)
+
+    table = ChunkTable()
+    heading_offsets = [h[0] for h in headings]
+
+    def page_at(pos: int) -> int:
+        return page_numbers[bisect_right(page_offsets, pos) - 1]
+
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            split = max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+            if split > start + chunk_size // 2:
+                end = split
+        h = bisect_right(heading_offsets, start) - 1
+        table.append(page_at(start), page_at(end - 1), start, end,
+                     headings[h][1] if h >= 0 else None)
+        start = end
+        while start < len(text) and text[start].isspace():
+            start += 1
+    return text, table
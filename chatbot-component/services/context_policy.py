@@ -0,0 +1,195 @@
+"""Per-query choice of how much of a document to send to the model."""
+import math
+import re
+from array import array
+from typing import Iterable, Sequence
+
+FULL = 'full'
+TOP_K = 'top_k'
+MAP_REDUCE = 'map_reduce'
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it of on or "
+    "that the this to was what when where which who why will with you".split())
+# Questions about the document as a whole cannot be answered from a few chunks
+_GLOBAL_QUERY = re.compile(
+    r'\b(summar\w*|overview|outline|main (points|ideas|themes)|key (points|takeaways)|'
+    r'whole (document|pdf)|entire (document|pdf)|tl;?dr)\b', re.IGNORECASE)
+
+
+def _terms(text: str) -> list[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+
+# PUBLIC_INTERFACE
+def is_global_query(query: str) -> bool:
+    """Return True if the query asks about the whole document, e.g. a summary."""
+    return _GLOBAL_QUERY.search(query) is not None
+
+
+# PUBLIC_INTERFACE
+def choose_strategy(document_tokens: int, budget_tokens: int, query: str) -> str:
+    """
+    Pick the cheapest strategy that can answer the query.
+
+    Args:
+        document_tokens: Token count of the whole document
+        budget_tokens: Tokens available for context in one model call
+        query: The user's question
+
+    Returns:
+        str: FULL if the document fits in one call, otherwise MAP_REDUCE
+        for whole-document questions and TOP_K for everything else
+    """
+    if document_tokens <= budget_tokens:
+        return FULL
+    if is_global_query(query):
+        return MAP_REDUCE
+    return TOP_K
+
+
+class TermIndex:
+    """
+    Inverted index of chunk terms for BM25 ranking.
+
+    Built once per document: for every term, the IDs of the chunks that
+    contain it and how often, plus the length in terms of every chunk.
+    Ranking a query then only touches the postings of its own terms.
+    """
+
+    def __init__(self, texts: Iterable[str]):
+        """
+        Index chunk texts.
+
+        Args:
+            texts: Chunk texts in chunk ID order
+        """
+        postings: dict[str, tuple[array, array]] = {}
+        self.lengths = array('I')
+        for chunk_id, text in enumerate(texts):
+            terms = _terms(text)
+            counts: dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array('I'), array('I'))
+                entry[0].append(chunk_id)
+                entry[1].append(count)
+            self.lengths.append(len(terms))
+        self.postings = postings
+        self.average_length = (sum(self.lengths) / len(self.lengths) if self.lengths else 0) or 1
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    # PUBLIC_INTERFACE
+    def rank(self, query: str, k1: float = 1.2, b: float = 0.75) -> list[int]:
+        """
+        Rank chunks by BM25 relevance to the query.
+
+        Args:
+            query: The user's question
+
+        Returns:
+            list[int]: IDs of chunks sharing at least one term with the query,
+            best first
+        """
+        n = len(self)
+        scores: dict[int, float] = {}
+        for term in set(_terms(query)):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            chunk_ids, counts = entry
+            idf = math.log(1 + (n - len(chunk_ids) + 0.5) / (len(chunk_ids) + 0.5))
+            for chunk_id, tf in zip(chunk_ids, counts):
+                norm = k1 * (1 - b + b * self.lengths[chunk_id] / self.average_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+        return sorted(scores, key=lambda chunk_id: (-scores[chunk_id], chunk_id))
+
+
+# PUBLIC_INTERFACE
+def rank_chunks(query: str, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> list[int]:
+    """
+    Rank chunks by BM25 relevance to the query, see TermIndex.
+
+    Args:
+        query: The user's question
+        texts: Chunk texts in chunk ID order
+
+    Returns:
+        list[int]: IDs of chunks sharing at least one term with the query,
+        best first
+    """
+    return TermIndex(texts).rank(query, k1, b)
+
+
+# PUBLIC_INTERFACE
+def pack(chunk_ids: Iterable[int], tokens: Sequence[int], budget_tokens: int, limit: int = 0) -> list[int]:
+    """
+    Greedily take chunks, in the given order, while they fit the budget.
+
+    Args:
+        chunk_ids: Candidate chunk IDs in priority order
+        tokens: Token count of every chunk, indexed by chunk ID
+        budget_tokens: Tokens available
+        limit: Maximum number of chunks, 0 for no limit
+
+    Returns:
+        list[int]: The selected chunk IDs in document order
+    """
+    selected = []
+    used = 0
+    for chunk_id in chunk_ids:
+        if used + tokens[chunk_id] > budget_tokens:
+            continue
+        selected.append(chunk_id)
+        used += tokens[chunk_id]
+        if limit and len(selected) >= limit:
+            break
+    return sorted(selected)
+
+
+# PUBLIC_INTERFACE
+def batches(tokens: Sequence[int], budget_tokens: int, max_batches: int = 0) -> list[list[int]]:
+    """
+    Split all chunks into consecutive batches that each fit the budget.
+
+    A chunk larger than the budget forms a batch of its own. If covering
+    every chunk would take more than ``max_batches`` batches, the document
+    is sampled instead: it is cut into ``max_batches`` equal spans of chunks
+    and each batch holds the leading chunks of one span that fit the budget.
+
+    Args:
+        tokens: Token count of every chunk, indexed by chunk ID
+        budget_tokens: Tokens available per batch
+        max_batches: Maximum number of batches, 0 for no limit
+
+    Returns:
+        list[list[int]]: Chunk IDs per batch, in document order
+    """
+    result: list[list[int]] = []
+    used = 0
+    for chunk_id, count in enumerate(tokens):
+        if not result or used + count > budget_tokens:
+            result.append([])
+            used = 0
+        result[-1].append(chunk_id)
+        used += count
+    if not max_batches or len(result) <= max_batches:
+        return result
+
+    sampled = []
+    for span in range(max_batches):
+        batch: list[int] = []
+        used = 0
+        for chunk_id in range(span * len(tokens) // max_batches, (span + 1) * len(tokens) // max_batches):
+            if batch and used + tokens[chunk_id] > budget_tokens:
+                break
+            batch.append(chunk_id)
+            used += tokens[chunk_id]
+        sampled.append(batch)
+    return sampled
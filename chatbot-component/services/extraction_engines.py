@@ -0,0 +1,230 @@
+"""Pluggable PDF text extraction engines."""
+import re
+from typing import BinaryIO, Iterator, Optional
+
+# A text object and the text-showing operators that may follow it. They
+# are searched for separately: a single lazy "BT.*?Tj" pattern rescans to
+# the end of the stream for every BT, which is quadratic on streams with
+# many text objects and no text.
+_TEXT_OBJECT = re.compile(rb"BT\b")
+_TEXT_OPERATORS = re.compile(rb"Tj|TJ|'|\"")
+
+
+def content_has_text(data: Optional[bytes]) -> bool:
+    """
+    Check whether a page content stream contains text-showing operators.
+
+    Args:
+        data: The decoded content stream, or None if the page has none
+
+    Returns:
+        bool: True if the stream may draw text
+    """
+    if not data:
+        return False
+    text_object = _TEXT_OBJECT.search(data)
+    return text_object is not None and _TEXT_OPERATORS.search(data, text_object.end()) is not None
+
+
+class ExtractionEngine:
+    """
+    Base class for PDF extraction backends.
+
+    Subclasses implement ``page_count`` and ``iter_pages`` and may override
+    ``available``. When
+    ``prescan`` is enabled, pages whose content streams hold no text
+    operators are skipped and returned as empty strings, so page numbers
+    stay aligned with the document.
+    """
+
+    name = ""
+
+    # PUBLIC_INTERFACE
+    def available(self) -> bool:
+        """Return True if the backend library can be imported."""
+        return True
+
+    # PUBLIC_INTERFACE
+    def page_count(self, stream: BinaryIO) -> int:
+        """Return the number of pages in the PDF."""
+        raise NotImplementedError
+
+    # PUBLIC_INTERFACE
+    def iter_pages(self, stream: BinaryIO, prescan: bool = True, start: int = 0) -> Iterator[str]:
+        """
+        Extract page texts lazily, one page at a time.
+
+        Args:
+            stream: A seekable binary stream with the PDF
+            prescan: Skip pages without text-bearing content streams
+            start: Index of the first page to extract
+
+        Yields:
+            str: The text of each page from ``start`` on, empty for pages without text
+        """
+        raise NotImplementedError
+
+    # PUBLIC_INTERFACE
+    def extract_pages(self, stream: BinaryIO, prescan: bool = True) -> list[str]:
+        """
+        Extract the text of every page.
+
+        Args:
+            stream: A seekable binary stream with the PDF
+            prescan: Skip pages without text-bearing content streams
+
+        Returns:
+            list[str]: One entry per page, empty for pages without text
+        """
+        stream.seek(0)
+        return list(self.iter_pages(stream, prescan))
+
+
+class _PdfReaderEngine(ExtractionEngine):
+    """Shared implementation for the PyPDF2 and pypdf readers."""
+
+    module = ""
+
+    def available(self) -> bool:
+        try:
+            __import__(self.module)
+            return True
+        except ImportError:
+            return False
+
+    def page_count(self, stream: BinaryIO) -> int:
+        return len(__import__(self.module).PdfReader(stream).pages)
+
+    def iter_pages(self, stream: BinaryIO, prescan: bool = True, start: int = 0) -> Iterator[str]:
+        reader = __import__(self.module).PdfReader(stream)
+        for index in range(start, len(reader.pages)):
+            page = reader.pages[index]
+            if prescan and not self._page_may_have_text(page):
+                yield ""
+            else:
+                yield page.extract_text() or ""
+
+    @staticmethod
+    def _page_may_have_text(page) -> bool:
+        try:
+            # Pages without content are decided before anything is decoded
+            contents = page.get('/Contents')
+            if contents is None:
+                return False
+            contents = contents.get_object()
+            if isinstance(contents, list) and not contents:
+                return False
+            resources = page.get('/Resources')
+            resources = resources.get_object() if resources is not None else {}
+            xobjects = resources.get('/XObject')
+            if xobjects is not None:
+                for ref in xobjects.get_object().values():
+                    if ref.get_object().get('/Subtype') == '/Form':
+                        # Form XObjects carry their own content; extract to be safe
+                        return True
+            # Decode each stream object directly; the reader keeps the decoded
+            # data on the object, so extract_text does not decode it again
+            streams = contents if isinstance(contents, list) else [contents]
+            return any(content_has_text(ref.get_object().get_data()) for ref in streams)
+        except Exception:
+            # Let the full extractor decide on anything the scan cannot parse
+            return True
+
+
+class PyPDF2Engine(_PdfReaderEngine):
+    """Extraction with PyPDF2, the historical default."""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+
+class PypdfEngine(_PdfReaderEngine):
+    """Extraction with pypdf, the maintained successor of PyPDF2."""
+
+    name = "pypdf"
+    module = "pypdf"
+
+
+class PdfminerEngine(ExtractionEngine):
+    """
+    Extraction with pdfminer.six.
+
+    Characters are still grouped into lines (without that, words on
+    adjacent lines run together) but text-box ordering, the expensive part
+    of layout analysis, is disabled.
+    """
+
+    name = "pdfminer"
+
+    def available(self) -> bool:
+        try:
+            import pdfminer  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def page_count(self, stream: BinaryIO) -> int:
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdftypes import resolve1
+        document = PDFDocument(PDFParser(stream))
+        return int(resolve1(resolve1(document.catalog['Pages'])['Count']))
+
+    def iter_pages(self, stream: BinaryIO, prescan: bool = True, start: int = 0) -> Iterator[str]:
+        from io import StringIO
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdftypes import resolve1
+
+        def may_have_text(page) -> bool:
+            try:
+                xobjects = resolve1(page.resources.get('XObject', {}))
+                if any(getattr(resolve1(x).attrs.get('Subtype'), 'name', None) == 'Form'
+                       for x in xobjects.values()):
+                    return True
+                return any(content_has_text(resolve1(c).get_data()) for c in page.contents)
+            except Exception:
+                return True
+
+        manager = PDFResourceManager(caching=True)
+        laparams = LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+        for index, page in enumerate(PDFPage.get_pages(stream)):
+            if index < start:
+                continue
+            if prescan and not may_have_text(page):
+                yield ""
+                continue
+            out = StringIO()
+            device = TextConverter(manager, out, laparams=laparams)
+            PDFPageInterpreter(manager, device).process_page(page)
+            device.close()
+            yield out.getvalue().replace("\x0c", "")
+
+
+ENGINES: dict[str, ExtractionEngine] = {
+    engine.name: engine for engine in (PyPDF2Engine(), PypdfEngine(), PdfminerEngine())
+}
+
+
+# PUBLIC_INTERFACE
+def get_engine(name: str) -> ExtractionEngine:
+    """
+    Look up an extraction engine by name.
+
+    Args:
+        name: One of the keys of ENGINES
+
+    Returns:
+        ExtractionEngine: The engine
+
+    Raises:
+        ValueError: If the name is unknown or its library is not installed
+    """
+    engine = ENGINES.get(name)
+    if engine is None:
+        raise ValueError(f"Unknown PDF extraction engine: {name}")
+    if not engine.available():
+        raise ValueError(f"PDF extraction engine '{name}' is not installed")
+    return engine
@@ -0,0 +1,273 @@
+"""Supervised PDF extraction in killable worker processes."""
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from io import BytesIO
+from typing import Optional
+
+from services.extraction_engines import ExtractionEngine
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be extracted at all."""
+
+
+def _apply_limits(cpu_seconds: Optional[int], memory_bytes: Optional[int]) -> None:
+    """
+    Cap the address space of the current (worker) process and allow it
+    ``cpu_seconds`` more CPU time from now.
+    """
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return
+    if cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime) + cpu_seconds
+        hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+
+def _worker(conn, cpu_seconds: Optional[int], memory_bytes: Optional[int]) -> None:
+    """
+    Worker process entry point, serving extraction jobs until the pipe closes.
+
+    Each job is ``(data, engine, prescan, start)``. The worker sends
+    ``('count', n)`` when starting at page 0, then ``('page', index, text)``
+    per page and finally ``('done',)``. Failures are reported as
+    ``('limit', index, 'memory')`` or ``('error', message)``.
+    """
+    while True:
+        try:
+            data, engine, prescan, start = conn.recv()
+        except EOFError:
+            return
+        index = start
+        try:
+            _apply_limits(cpu_seconds, memory_bytes)
+            if start == 0:
+                conn.send(('count', engine.page_count(BytesIO(data))))
+            for text in engine.iter_pages(BytesIO(data), prescan, start):
+                conn.send(('page', index, text))
+                index += 1
+            conn.send(('done',))
+        except MemoryError:
+            conn.send(('limit', index, 'memory'))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class _Worker:
+    """A worker process and the supervisor's end of its pipe."""
+
+    def __init__(self, context, cpu_seconds: Optional[int], memory_bytes: Optional[int]):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child, cpu_seconds, memory_bytes),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SupervisedExtractor:
+    """
+    Runs an extraction engine in a child process under time and resource budgets.
+
+    Each page must arrive within ``page_timeout`` seconds and the whole
+    document within ``document_timeout``. The worker runs with an
+    address-space limit of ``memory_bytes`` and a CPU-time limit of
+    ``cpu_seconds`` per document. A page that exceeds a budget is skipped
+    and reported: the worker is killed and a fresh one resumes at the next
+    page, up to ``max_restarts`` times. Whatever is left when the document
+    budget or the restarts run out is skipped as well.
+
+    Starting a worker is expensive (the child re-imports the parent's
+    ``__main__`` module), so up to ``workers`` idle workers are kept
+    running and reused across documents. A killed worker is replaced right
+    away, and a worker is retired after ``max_jobs_per_worker`` documents.
+    """
+
+    def __init__(self, page_timeout: float = 5.0, document_timeout: float = 60.0,
+                 cpu_seconds: Optional[int] = 30, memory_bytes: Optional[int] = 512 * 1024 * 1024,
+                 max_pages: Optional[int] = None, max_text_chars: Optional[int] = None,
+                 max_restarts: int = 3, workers: int = 1, max_jobs_per_worker: int = 100,
+                 start_method: Optional[str] = None):
+        """Initialize the extractor with its budgets; workers start on first use or start()."""
+        self.page_timeout = page_timeout
+        self.document_timeout = document_timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.max_pages = max_pages
+        self.max_text_chars = max_text_chars
+        self.max_restarts = max_restarts
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = 'forkserver' if 'forkserver' in methods else 'spawn'
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            self._context.set_forkserver_preload(['services.extraction_engines', 'PyPDF2'])
+        self._lock = threading.Lock()
+        self._idle: list[_Worker] = []
+        self._starting = 0  # workers being started by start()
+
+    # PUBLIC_INTERFACE
+    def start(self) -> None:
+        """Start idle workers until ``workers`` are waiting for documents."""
+        with self._lock:
+            self._idle = [w for w in self._idle if w.process.is_alive()]
+            missing = self.workers - len(self._idle) - self._starting
+            self._starting += max(missing, 0)
+        # Process start is slow; do it outside the lock so _acquire is not held up
+        for started in range(missing):
+            try:
+                worker = _Worker(self._context, self.cpu_seconds, self.memory_bytes)
+            except Exception:
+                with self._lock:
+                    self._starting -= missing - started
+                raise
+            with self._lock:
+                self._starting -= 1
+                self._idle.append(worker)
+
+    # PUBLIC_INTERFACE
+    def close(self) -> None:
+        """Stop all idle workers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+    def _acquire(self) -> _Worker:
+        """Take an idle worker, or start one if none is waiting."""
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.stop()
+        return _Worker(self._context, self.cpu_seconds, self.memory_bytes)
+
+    def _release(self, worker: _Worker, reusable: bool) -> None:
+        """Return a worker that finished its job cleanly to the pool, otherwise replace it."""
+        worker.jobs += 1
+        if reusable and worker.jobs < self.max_jobs_per_worker and worker.process.is_alive():
+            with self._lock:
+                if len(self._idle) < self.workers:
+                    self._idle.append(worker)
+                    return
+        worker.stop()
+        self.start()
+
+    # PUBLIC_INTERFACE
+    def extract_pages(self, data: bytes, engine: ExtractionEngine,
+                      prescan: bool = True) -> tuple[list[str], list[dict]]:
+        """
+        Extract the text of every page within the configured budgets.
+
+        Args:
+            data: The PDF file contents
+            engine: The extraction engine to run in the worker
+            prescan: Skip pages without text-bearing content streams
+
+        Returns:
+            tuple: (pages, skipped_pages)
+            - pages: One entry per page, empty for pages without text or skipped
+            - skipped_pages: {'page': 1-based page number, 'reason': reason} per skipped page
+
+        Raises:
+            ExtractionError: If the document cannot be opened or exceeds max_pages
+        """
+        deadline = time.monotonic() + self.document_timeout
+        pages: Optional[list[str]] = None
+        skipped: list[dict] = []
+        text_chars = 0
+        start = 0
+        restarts = 0
+
+        while pages is None or start < len(pages):
+            if restarts > self.max_restarts:
+                reason = 'too-many-failures'
+                break
+            if time.monotonic() >= deadline:
+                reason = 'document-timeout'
+                break
+            worker = self._acquire()
+            failure = None
+            reusable = False
+            try:
+                try:
+                    worker.conn.send((data, engine, prescan, start))
+                except OSError:
+                    failure = 'crashed'
+                while failure is None:
+                    budget = min(self.page_timeout, deadline - time.monotonic())
+                    if budget <= 0 or not worker.conn.poll(budget):
+                        failure = 'page-timeout' if time.monotonic() < deadline else 'document-timeout'
+                        break
+                    try:
+                        message = worker.conn.recv()
+                    except EOFError:
+                        worker.process.join(1)
+                        failure = 'cpu-limit' if worker.process.exitcode == -signal.SIGXCPU else 'crashed'
+                        break
+                    kind = message[0]
+                    if kind == 'count':
+                        if self.max_pages is not None and message[1] > self.max_pages:
+                            raise ExtractionError(
+                                f"PDF has {message[1]} pages; the limit is {self.max_pages}")
+                        pages = [""] * message[1]
+                    elif kind == 'page':
+                        pages[message[1]] = message[2]
+                        text_chars += len(message[2])
+                        start = message[1] + 1
+                        if self.max_text_chars is not None and text_chars > self.max_text_chars:
+                            pages[message[1]] = ""
+                            skipped.append({'page': message[1] + 1, 'reason': 'text-limit'})
+                            failure = 'text-limit'
+                            break
+                    elif kind == 'limit':
+                        failure = message[2] + '-limit'
+                        break
+                    elif kind == 'error':
+                        reusable = True
+                        raise ExtractionError(message[1])
+                    else:  # done
+                        reusable = True
+                        break
+            finally:
+                self._release(worker, reusable)
+
+            if failure is None:
+                return pages, skipped
+            if failure in ('document-timeout', 'text-limit'):
+                reason = failure
+                break
+            if pages is None:
+                # The worker failed before it could count the pages
+                restarts += 1
+                continue
+            if start < len(pages):
+                skipped.append({'page': start + 1, 'reason': failure})
+                start += 1
+            restarts += 1
+        else:
+            return pages, skipped
+
+        if pages is None:
+            raise ExtractionError(f"PDF could not be opened within limits ({reason})")
+        skipped.extend({'page': index + 1, 'reason': reason} for index in range(start, len(pages)))
+        return pages, skipped
@@ -0,0 +1,232 @@
+"""Model routing and upstream failover for chat completions."""
+import threading
+import time
+from typing import Optional
+
+from services.tokens import count_tokens
+
+# Query types passed by callers of ModelRouter.complete
+ANSWER = 'answer'
+EXTRACT = 'extract'  # map-step sub-calls that only pull notes out of a batch of chunks
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when no upstream could serve a request."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests are refused for ``reset_seconds``. It then lets a single trial
+    request through (half-open): success closes the circuit, failure opens
+    it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """Initialize a closed circuit."""
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """The current state: CLOSED, OPEN or HALF_OPEN."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    # PUBLIC_INTERFACE
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    # PUBLIC_INTERFACE
+    def record_success(self) -> None:
+        """Close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    # PUBLIC_INTERFACE
+    def release_trial(self) -> None:
+        """End a half-open trial that gave no verdict, leaving the failure count as it is."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    # PUBLIC_INTERFACE
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold or after a failed trial."""
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class Upstream:
+    """An OpenAI-compatible endpoint with its own circuit breaker."""
+
+    def __init__(self, name: str, api_base: str, api_key: Optional[str], breaker: CircuitBreaker):
+        self.name = name
+        self.api_base = api_base
+        self.api_key = api_key
+        self.breaker = breaker
+        self.requests = 0
+        self.failures = 0
+
+
+class ModelRouter:
+    """
+    Routes chat completions to a model and an upstream.
+
+    The model is chosen from the prompt size and query type: short prompts
+    and EXTRACT sub-calls go to the fast model, prompts too large for the
+    default model's context go to the large-context model, and everything
+    else goes to the default model. Upstreams are tried in order, skipping
+    those whose circuit is open; timeouts, connection failures, rate limits
+    and 5xx errors count against the upstream's breaker and fail over to
+    the next one, while other errors (bad request, authentication) are
+    raised immediately.
+    """
+
+    def __init__(self, default_model: str, fast_model: str, large_context_model: str,
+                 default_context_tokens: int, fast_max_prompt_tokens: int, response_reserve_tokens: int,
+                 upstreams: list[Upstream], timeout: float):
+        """Initialize the router with its models and upstreams, in failover order."""
+        self.default_model = default_model
+        self.fast_model = fast_model
+        self.large_context_model = large_context_model
+        self.default_context_tokens = default_context_tokens
+        self.fast_max_prompt_tokens = fast_max_prompt_tokens
+        self.response_reserve_tokens = response_reserve_tokens
+        self.upstreams = upstreams
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._model_requests: dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config) -> 'ModelRouter':
+        """Build a router from the CHAT_MODEL_* and OPENAI_* settings of Config."""
+        def breaker():
+            return CircuitBreaker(config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_SECONDS)
+        upstreams = [Upstream('primary', config.OPENAI_API_BASE, config.OPENAI_API_KEY, breaker())]
+        if config.OPENAI_FALLBACK_API_BASE:
+            upstreams.append(Upstream('fallback', config.OPENAI_FALLBACK_API_BASE,
+                                      config.OPENAI_FALLBACK_API_KEY or config.OPENAI_API_KEY, breaker()))
+        return cls(config.CHAT_MODEL, config.CHAT_MODEL_FAST, config.CHAT_MODEL_LARGE_CONTEXT,
+                   config.MODEL_CONTEXT_TOKENS, config.FAST_MODEL_MAX_PROMPT_TOKENS,
+                   config.RESPONSE_RESERVE_TOKENS, upstreams, config.UPSTREAM_TIMEOUT)
+
+    # PUBLIC_INTERFACE
+    def choose_model(self, prompt_tokens: int, query_type: str = ANSWER) -> str:
+        """
+        Pick the model for a request.
+
+        Args:
+            prompt_tokens: Token count of all messages
+            query_type: ANSWER or EXTRACT
+
+        Returns:
+            str: The model name
+        """
+        if prompt_tokens + self.response_reserve_tokens > self.default_context_tokens:
+            return self.large_context_model
+        if query_type == EXTRACT or prompt_tokens <= self.fast_max_prompt_tokens:
+            return self.fast_model
+        return self.default_model
+
+    # PUBLIC_INTERFACE
+    def complete(self, messages: list[dict], query_type: str = ANSWER) -> str:
+        """
+        Run a chat completion on the routed model, failing over between upstreams.
+
+        Args:
+            messages: Chat messages in OpenAI format
+            query_type: ANSWER or EXTRACT
+
+        Returns:
+            str: The content of the first choice
+
+        Raises:
+            UpstreamUnavailable: If every upstream failed or has an open circuit
+            Exception: Non-retryable errors from the upstream
+        """
+        import openai
+        retryable = (openai.error.Timeout, openai.error.APIConnectionError,
+                     openai.error.ServiceUnavailableError, openai.error.RateLimitError,
+                     openai.error.TryAgain)
+
+        model = self.choose_model(sum(count_tokens(m['content']) for m in messages), query_type)
+        with self._lock:
+            self._model_requests[model] = self._model_requests.get(model, 0) + 1
+        last_error: Optional[Exception] = None
+        for upstream in self.upstreams:
+            if not upstream.breaker.allow():
+                continue
+            with self._lock:
+                upstream.requests += 1
+            try:
+                response = openai.ChatCompletion.create(
+                    model=model,
+                    messages=messages,
+                    api_base=upstream.api_base,
+                    api_key=upstream.api_key,
+                    request_timeout=self.timeout,
+                )
+            except Exception as e:
+                server_error = isinstance(e, openai.error.APIError) and (e.http_status or 500) >= 500
+                if not (isinstance(e, retryable) or server_error):
+                    # The request itself is bad; another upstream will not help, and
+                    # the error says nothing about the upstream's health
+                    upstream.breaker.release_trial()
+                    raise
+                with self._lock:
+                    upstream.failures += 1
+                upstream.breaker.record_failure()
+                last_error = e
+                continue
+            upstream.breaker.record_success()
+            return response.choices[0].message.content
+        if last_error is not None:
+            raise UpstreamUnavailable(f"All upstreams failed: {last_error}") from last_error
+        raise UpstreamUnavailable("All upstreams are unavailable (circuit open)")
+
+    # PUBLIC_INTERFACE
+    def stats(self) -> dict:
+        """
+        Report routing and upstream health.
+
+        Returns:
+            dict: 'models' with request counts per model and 'upstreams' with
+            state, requests and failures per upstream
+        """
+        with self._lock:
+            models = dict(self._model_requests)
+        return {
+            'models': models,
+            'upstreams': {u.name: {'state': u.breaker.state, 'requests': u.requests,
+                                   'failures': u.failures} for u in self.upstreams},
+        }
@@ -1,15 +1,46 @@
 """PDF processing service for text extraction."""
+import hashlib
 import os
+from io import BytesIO
 from typing import Optional, Set
-from PyPDF2 import PdfReader
 from werkzeug.datastructures import FileStorage
+from config import Config
+from services.chunk_table import ChunkTable, build_chunk_table
+from services.extraction_engines import ExtractionEngine, get_engine
+from services.extraction_supervisor import SupervisedExtractor
+from services.single_flight import SingleFlight
+
+def _pdf_reader(stream):
+    """Open a PDF with PyPDF2, importing it on first use to keep startup fast."""
+    from PyPDF2 import PdfReader
+    return PdfReader(stream)
 
 class PDFProcessor:
     """Handles PDF file processing and text extraction."""
     
     def __init__(self):
-        """Initialize PDFProcessor with allowed extensions."""
+        """Initialize PDFProcessor with allowed extensions and extraction budgets."""
         self._allowed_extensions: Set[str] = {'pdf'}
+        self._supervisor: Optional[SupervisedExtractor] = None
+        # Concurrent uploads of the same file share one extraction
+        self.single_flight = SingleFlight()
+        if Config.PDF_SUPERVISED:
+            self._supervisor = SupervisedExtractor(
+                page_timeout=Config.PDF_PAGE_TIMEOUT,
+                document_timeout=Config.PDF_DOCUMENT_TIMEOUT,
+                cpu_seconds=Config.PDF_WORKER_CPU_SECONDS,
+                memory_bytes=Config.PDF_WORKER_MEMORY_MB * 1024 * 1024,
+                max_pages=Config.PDF_MAX_PAGES,
+                max_text_chars=Config.PDF_MAX_TEXT_CHARS,
+                workers=Config.PDF_WORKERS,
+                max_jobs_per_worker=Config.PDF_WORKER_MAX_JOBS,
+            )
+    
+    # PUBLIC_INTERFACE
+    def start_workers(self) -> None:
+        """Start the idle extraction workers ahead of the first upload, if extraction is supervised."""
+        if self._supervisor is not None:
+            self._supervisor.start()
     
     def allowed_file(self, filename: str) -> bool:
         """
@@ -23,6 +54,27 @@ class PDFProcessor:
         """
         return '.' in filename and filename.rsplit('.', 1)[1].lower() in self._allowed_extensions
     
+    # PUBLIC_INTERFACE
+    def select_engine(self, file: FileStorage) -> ExtractionEngine:
+        """
+        Choose the extraction engine for a document from its size.
+        
+        Files of at least Config.PDF_LARGE_FILE_BYTES use Config.PDF_LARGE_ENGINE,
+        all others Config.PDF_ENGINE.
+        
+        Args:
+            file: The uploaded PDF file
+            
+        Returns:
+            ExtractionEngine: The configured engine
+        """
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(0)
+        if size >= Config.PDF_LARGE_FILE_BYTES:
+            return get_engine(Config.PDF_LARGE_ENGINE)
+        return get_engine(Config.PDF_ENGINE)
+    
     # PUBLIC_INTERFACE
     def extract_text(self, file: FileStorage) -> tuple[str, Optional[str]]:
         """
@@ -36,26 +88,63 @@ class PDFProcessor:
             - extracted_text: The extracted text from the PDF
             - error_message: Error message if any, None otherwise
         """
+        text, _, _, error = self.extract_document(file)
+        return text, error
+    
+    # PUBLIC_INTERFACE
+    def extract_document(self, file: FileStorage,
+                         engine: Optional[str] = None) -> tuple[str, Optional[ChunkTable], list[dict], Optional[str]]:
+        """
+        Extract text from a PDF file together with per-chunk page metadata.
+        
+        With Config.PDF_SUPERVISED, extraction runs in a worker process under
+        per-page and per-document time budgets and CPU/memory limits; pages
+        that exceed a budget are skipped and reported instead of stalling
+        the request. Concurrent calls for identical content and engine wait
+        on a single extraction and share its result.
+        
+        Args:
+            file: The uploaded PDF file
+            engine: Name of the extraction engine, chosen by select_engine if omitted
+            
+        Returns:
+            tuple: (extracted_text, chunks, skipped_pages, error_message)
+            - extracted_text: The extracted text from the PDF
+            - chunks: Page range, offsets and heading of each chunk of the text
+            - skipped_pages: {'page': page_number, 'reason': reason} for each skipped page
+            - error_message: Error message if any, None otherwise
+        """
         try:
             if not self.allowed_file(file.filename):
-                return "", "Invalid file type. Only PDF files are allowed."
+                return "", None, [], "Invalid file type. Only PDF files are allowed."
             
-            reader = PdfReader(file)
-            if len(reader.pages) == 0:
-                return "", "PDF file is empty"
+            extractor = get_engine(engine) if engine else self.select_engine(file)
+            data = file.read()
+            key = (hashlib.sha256(data).hexdigest(), extractor.name)
+            return self.single_flight.do(key, self._extract_document, data, extractor)
+        except Exception as e:
+            return "", None, [], f"Error extracting text from PDF: {str(e)}"
+    
+    def _extract_document(self, data: bytes,
+                          extractor: ExtractionEngine) -> tuple[str, Optional[ChunkTable], list[dict], Optional[str]]:
+        """Extract and chunk PDF bytes; see extract_document."""
+        try:
+            if self._supervisor is not None:
+                pages, skipped = self._supervisor.extract_pages(
+                    data, extractor, prescan=Config.PDF_PRESCAN)
+            else:
+                pages, skipped = extractor.extract_pages(BytesIO(data), prescan=Config.PDF_PRESCAN), []
+            if len(pages) == 0:
+                return "", None, skipped, "PDF file is empty"
                 
-            text = ""
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+            text, chunks = build_chunk_table(pages, Config.CHUNK_SIZE)
                     
-            if not text.strip():
-                return "", "No text could be extracted from the PDF"
+            if not text:
+                return "", None, skipped, "No text could be extracted from the PDF"
                 
-            return text.strip(), None
+            return text, chunks, skipped, None
         except Exception as e:
-            return "", f"Error extracting text from PDF: {str(e)}"
+            return "", None, [], f"Error extracting text from PDF: {str(e)}"
     
     # PUBLIC_INTERFACE
     def handle_encrypted_pdf(self, file: FileStorage, password: str) -> tuple[str, Optional[str]]:
@@ -72,7 +161,7 @@ class PDFProcessor:
             - error_message: Error message if any, None otherwise
         """
         try:
-            reader = PdfReader(file)
+            reader = _pdf_reader(file)
             if reader.is_encrypted:
                 reader.decrypt(password)
             text = ""
@@ -85,7 +174,13 @@ class PDFProcessor:
     # PUBLIC_INTERFACE
     def validate_pdf(self, file: FileStorage) -> tuple[bool, Optional[str]]:
         """
-        Validate if the file is a valid PDF.
+        Validate if the file looks like a PDF.
+        
+        Only the file name and the ``%PDF-`` header are checked here, in the
+        request process. Parsing the document can take unbounded time and
+        memory, so it is left to extraction, which opens the document inside
+        a supervised worker and reports a PDF that cannot be opened as an
+        error.
         
         Args:
             file: The file to validate
@@ -99,9 +194,12 @@ class PDFProcessor:
             if not file.filename.lower().endswith('.pdf'):
                 return False, "File must be a PDF"
             
-            reader = PdfReader(file)
+            # Readers accept the header anywhere in the first 1024 bytes
+            header = file.read(1024)
             # Reset file pointer for future reads
             file.seek(0)
+            if b'%PDF-' not in header:
+                return False, "Invalid PDF file: missing %PDF- header"
             return True, None
         except Exception as e:
             return False, f"Invalid PDF file: {str(e)}"
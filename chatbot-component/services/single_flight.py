@@ -0,0 +1,103 @@
+"""Single-flight coalescing of identical concurrent work."""
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    """An in-progress computation and the callers waiting on it."""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    Callers that arrive while a computation for the same key is in progress
+    wait for it and share its result (or its exception) instead of starting
+    their own. Nothing is cached: once the computation finishes, the next
+    call for the key starts a new one.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._total = 0
+        self._executions = 0
+        self._coalesced = 0
+        self._waiting = 0
+        self._max_waiters = 0
+
+    # PUBLIC_INTERFACE
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)``, or wait for the identical call in flight.
+
+        Args:
+            key: Identifies identical work, e.g. a content hash
+            fn: The computation
+
+        Returns:
+            The result of the (possibly shared) computation
+
+        Raises:
+            Whatever the shared computation raised
+        """
+        with self._lock:
+            self._total += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                call.waiters += 1
+                self._coalesced += 1
+                self._waiting += 1
+                self._max_waiters = max(self._max_waiters, call.waiters)
+
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                self._waiting -= 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    # PUBLIC_INTERFACE
+    def stats(self) -> dict:
+        """
+        Return coalescing counters.
+
+        Returns:
+            dict: calls, executions, coalesced (calls that shared a result),
+            in_flight, waiting (callers blocked right now) and max_waiters
+            (most callers ever sharing one computation)
+        """
+        with self._lock:
+            return {
+                'calls': self._total,
+                'executions': self._executions,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls),
+                'waiting': self._waiting,
+                'max_waiters': self._max_waiters,
+            }
@@ -0,0 +1,47 @@
+"""Token counting for prompt budgeting."""
+import math
+import threading
+
+_lock = threading.Lock()
+_encoding = None
+_loaded = False
+
+
+# PUBLIC_INTERFACE
+def load_tokenizer():
+    """
+    Load the tokenizer on first use.
+
+    Uses tiktoken's cl100k_base encoding when tiktoken is installed and its
+    data is available; returns None otherwise, in which case counts are
+    estimated.
+    """
+    global _encoding, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding('cl100k_base')
+                except Exception:
+                    _encoding = None
+                _loaded = True
+    return _encoding
+
+
+# PUBLIC_INTERFACE
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        int: Exact count with tiktoken, otherwise an estimate of four
+        characters per token
+    """
+    encoding = load_tokenizer()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
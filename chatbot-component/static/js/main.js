@@ -158,6 +158,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
             const data = await response.json();
             showMessage('assistant', data.response);
+            if (data.pages && data.pages.length) {
+                showMessage('system', 'Sources: page ' + data.pages.join(', '));
+            }
         } catch (error) {
             showError('Failed to get response: ' + error.message);
         } finally {
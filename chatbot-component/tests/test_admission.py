@@ -0,0 +1,100 @@
+import threading
+import time
+import pytest
+from services.admission import AdmissionPool, Rejected, parse_priorities
+
+def hold(pool, release, priority=0, started=None, order=None, name=None):
+    """Start a thread that holds a pool slot until release is set."""
+    def run():
+        try:
+            with pool.admit(priority):
+                if order is not None:
+                    order.append(name)
+                if started is not None:
+                    started.set()
+                release.wait(5)
+        except Rejected:
+            if order is not None:
+                order.append(f"{name}:shed")
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def wait_for(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+def test_concurrency_is_bounded():
+    """Test no more than max_concurrent requests are admitted at once."""
+    pool = AdmissionPool('test', max_concurrent=2, max_queue_seconds=5, max_queue=10)
+    release = threading.Event()
+    threads = [hold(pool, release) for _ in range(4)]
+    wait_for(lambda: pool.stats()['waiting'] == 2)
+    assert pool.stats()['active'] == 2
+    release.set()
+    for t in threads:
+        t.join()
+    stats = pool.stats()
+    assert stats['admitted'] == 4
+    assert stats['active'] == stats['waiting'] == 0
+
+def test_queue_timeout_sheds_with_retry_after():
+    """Test requests queued longer than the budget are shed."""
+    pool = AdmissionPool('test', max_concurrent=1, max_queue_seconds=0.1, max_queue=10)
+    release = threading.Event()
+    started = threading.Event()
+    holder = hold(pool, release, started=started)
+    started.wait(5)
+    began = time.monotonic()
+    with pytest.raises(Rejected) as exc_info:
+        with pool.admit():
+            pass
+    assert time.monotonic() - began < 1
+    assert exc_info.value.reason == 'queue_timeout'
+    assert exc_info.value.retry_after >= 1
+    release.set()
+    holder.join()
+    assert pool.stats()['shed'] == {'queue_timeout': 1}
+
+def test_full_queue_sheds_immediately():
+    """Test requests arriving at a full queue are shed without waiting."""
+    pool = AdmissionPool('test', max_concurrent=1, max_queue_seconds=5, max_queue=1)
+    release = threading.Event()
+    threads = [hold(pool, release), hold(pool, release)]
+    wait_for(lambda: pool.stats()['waiting'] == 1)
+    with pytest.raises(Rejected) as exc_info:
+        with pool.admit():
+            pass
+    assert exc_info.value.reason == 'queue_full'
+    release.set()
+    for t in threads:
+        t.join()
+
+def test_higher_priority_is_admitted_first():
+    """Test priority lanes jump the queue."""
+    pool = AdmissionPool('test', max_concurrent=1, max_queue_seconds=5, max_queue=10)
+    release_first = threading.Event()
+    release = threading.Event()
+    started = threading.Event()
+    order = []
+    first = hold(pool, release_first, started=started, order=order, name='first')
+    started.wait(5)
+    low = hold(pool, release, priority=0, order=order, name='low')
+    wait_for(lambda: pool.stats()['waiting'] == 1)
+    high = hold(pool, release, priority=10, order=order, name='high')
+    wait_for(lambda: pool.stats()['waiting'] == 2)
+    release.set()
+    release_first.set()
+    for t in (first, low, high):
+        t.join()
+    assert order == ['first', 'high', 'low']
+
+def test_parse_priorities():
+    """Test API key priority configuration parsing."""
+    assert parse_priorities("") == {}
+    assert parse_priorities("key-a:10, key-b:5") == {'key-a': 10, 'key-b': 5}
+    with pytest.raises(ValueError):
+        parse_priorities(":3")
@@ -120,3 +120,71 @@ def test_rate_limiting(client):
     # Check that the last request was rate limited
     assert responses[-1].status_code == 429
     assert b'Rate limit exceeded' in responses[-1].data
+
+def test_chat_returns_citations(client, sample_pdf):
+    """Test chat endpoint returns cited chunk and page IDs."""
+    with open(sample_pdf, 'rb') as f:
+        pdf_content = f.read()
+    
+    client.post('/upload', data={
+        'file': (BytesIO(pdf_content), 'test.pdf')
+    })
+    
+    mock_response = "The document says Test PDF [chunk 0]."
+    with patch('services.chat_service.ChatService.get_response', return_value=(mock_response, None)):
+        response = client.post('/chat', json={'query': 'test question'})
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [c['chunk_id'] for c in data['citations']] == [0]
+        assert data['pages'] == [1]
+
+def test_healthz_reports_readiness(client):
+    """Test readiness endpoint reports 503 until warm-up completes, then 200."""
+    import app as app_module
+    response = client.get('/healthz')
+    assert response.status_code in (200, 503)
+    
+    assert app_module._warm_up_done.wait(timeout=10)
+    response = client.get('/healthz')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['ready'] is True
+    assert data['warm_up_seconds'] >= 0
+
+def test_metrics_reports_single_flight(client):
+    """Test metrics endpoint exposes coalescing counters."""
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    for name in ('upload_single_flight', 'chat_single_flight'):
+        assert set(data[name]) >= {'calls', 'executions', 'coalesced', 'waiting', 'max_waiters'}
+
+def test_chat_shed_when_overloaded(client, monkeypatch):
+    """Test chat returns 503 with Retry-After when its pool is saturated, while uploads are unaffected."""
+    import threading
+    import app as app_module
+    pool = app_module.chat_admission
+    monkeypatch.setattr(pool, 'max_concurrent', 1)
+    monkeypatch.setattr(pool, 'max_queue_seconds', 0.05)
+    
+    release = threading.Event()
+    admitted = threading.Event()
+    def occupy():
+        with pool.admit():
+            admitted.set()
+            release.wait(5)
+    holder = threading.Thread(target=occupy)
+    holder.start()
+    admitted.wait(5)
+    try:
+        response = client.post('/chat', json={'query': 'hi'})
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+        assert b'Server is busy' in response.data
+        
+        # Uploads use their own pool and are still admitted
+        response = client.post('/upload')
+        assert response.status_code == 400
+    finally:
+        release.set()
+        holder.join()
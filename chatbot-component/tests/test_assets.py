@@ -0,0 +1,55 @@
+import gzip
+import shutil
+import pytest
+from flask import Flask, url_for
+import assets
+
+@pytest.fixture
+def built_static(app, tmp_path):
+    """Build fingerprinted assets from a copy of the static folder."""
+    static_dir = tmp_path / 'static'
+    shutil.copytree(app.static_folder, static_dir, ignore=shutil.ignore_patterns(assets.DIST_DIR))
+    manifest = assets.build(str(static_dir))
+    return static_dir, manifest
+
+def test_build_writes_hashed_and_compressed_files(built_static):
+    """Test the build emits hashed names, gzip variants and a manifest."""
+    static_dir, manifest = built_static
+    assert set(manifest) == {'css/style.css', 'js/main.js'}
+    hashed = manifest['js/main.js']
+    assert hashed.startswith('dist/js/main.') and hashed.endswith('.js')
+    with open(static_dir / 'js' / 'main.js', 'rb') as f:
+        original = f.read()
+    with open(static_dir / (hashed + '.gz'), 'rb') as f:
+        assert gzip.decompress(f.read()) == original
+    assert assets.load_manifest(str(static_dir)) == manifest
+
+def test_load_manifest_missing(tmp_path):
+    """Test an unbuilt static folder yields an empty manifest."""
+    assert assets.load_manifest(str(tmp_path)) == {}
+
+def test_hashed_assets_served_immutable(built_static):
+    """Test url_for resolves through the manifest and assets are cached forever."""
+    static_dir, manifest = built_static
+    hashed = manifest['css/style.css']
+    fresh = Flask(__name__, static_folder=str(static_dir))
+    assets.init_app(fresh)
+    with fresh.test_request_context():
+        assert url_for('static', filename='css/style.css') == '/static/' + hashed
+    
+    client = fresh.test_client()
+    response = client.get('/static/' + hashed, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Content-Type'].startswith('text/css')
+    assert response.headers['Cache-Control'] == assets.IMMUTABLE_CACHE_CONTROL
+    assert 'Accept-Encoding' in response.headers['Vary']
+    
+    response = client.get('/static/' + hashed)
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Cache-Control'] == assets.IMMUTABLE_CACHE_CONTROL
+    
+    # Unbuilt files keep Flask's default handling
+    response = client.get('/static/css/style.css')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] != assets.IMMUTABLE_CACHE_CONTROL
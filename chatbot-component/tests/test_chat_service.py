@@ -1,7 +1,10 @@
+import re
+
 import pytest
 import openai
 from app import ChatService
-from unittest.mock import patch, MagicMock
+from config import Config
+from unittest.mock import ANY, patch, MagicMock
 
 @pytest.fixture
 def mock_openai_response():
@@ -28,7 +31,10 @@ def test_generate_response(mock_openai_response):
             messages=[
                 {"role": "system", "content": "Context from PDF: Test context"},
                 {"role": "user", "content": "Test question"}
-            ]
+            ],
+            api_base=Config.OPENAI_API_BASE,
+            api_key=ANY,
+            request_timeout=Config.UPSTREAM_TIMEOUT
         )
 
 def test_generate_response_error():
@@ -38,3 +44,156 @@ def test_generate_response_error():
         with pytest.raises(Exception) as exc_info:
             chat_service.generate_response("Test question", "Test context")
         assert str(exc_info.value) == "API Error"
+
+def test_identical_queries_are_coalesced(mock_openai_response):
+    """Test concurrent identical queries share one completion call."""
+    import threading
+    chat_service = ChatService()
+    chat_service.set_context("Test context")
+    release = threading.Event()
+    def slow_create(**kwargs):
+        release.wait(5)
+        return mock_openai_response
+    
+    with patch('openai.ChatCompletion.create', side_effect=slow_create) as create:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(chat_service.get_response("Same question")))
+                   for _ in range(3)]
+        for t in threads:
+            t.start()
+        for _ in range(500):
+            if chat_service.single_flight.stats()['waiting'] == 2:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+        
+        assert create.call_count == 1
+        assert results == [("This is a test response", None)] * 3
+        assert chat_service.single_flight.stats()['coalesced'] == 2
+
+def test_context_round_trips_through_chunk_store():
+    """Test the stored context equals the uploaded text and is reported."""
+    from services.chunk_table import build_chunk_table
+    text, chunks = build_chunk_table(["Page one " * 200, "Page two " * 200], chunk_size=300)
+    chat_service = ChatService()
+    chat_service.set_context(text, chunks)
+    assert chat_service.context == text
+    assert len(chat_service.store) == len(chunks)
+    stats = chat_service.memory_stats()
+    assert stats['raw_bytes'] == len(text.encode('utf-8'))
+    assert stats['bytes'] < stats['raw_bytes']
+
+def _large_document(pages=40):
+    from services.chunk_table import build_chunk_table
+    body = ["Section %d covers topic number %d in detail. " % (i, i) * 40 for i in range(pages)]
+    body[7] = "The warranty period is five years for all hardware. " * 10
+    return build_chunk_table(body, chunk_size=1000)
+
+def test_small_document_uses_full_context():
+    """Test documents that fit the context window are sent whole."""
+    chat_service = ChatService()
+    chat_service.set_context("Short document text")
+    with patch.object(ChatService, 'generate_response', return_value="Answer") as generate:
+        assert chat_service.get_response("What is this?") == ("Answer", None)
+        assert generate.call_args[0][1] == "Short document text"
+    stats = chat_service.query_stats()
+    assert stats['strategies']['full']['queries'] == 1
+    assert stats['recent'][-1]['calls'] == 1
+    assert stats['recent'][-1]['prompt_tokens'] > 0
+
+def test_large_document_uses_top_k():
+    """Test targeted questions on large documents send only the best chunks."""
+    text, chunks = _large_document()
+    chat_service = ChatService()
+    chat_service.set_context(text, chunks)
+    with patch.object(ChatService, 'generate_response', return_value="Five years [chunk 9]") as generate:
+        response, error = chat_service.get_response("How long is the warranty period?")
+        assert error is None
+        context = generate.call_args[0][1]
+        assert "warranty period is five years" in context
+        assert len(context) < len(text) / 2
+    assert chat_service.query_stats()['recent'][-1]['strategy'] == 'top_k'
+
+def test_large_document_summary_uses_map_reduce():
+    """Test whole-document questions on large documents map over all chunks in parallel."""
+    text, chunks = _large_document()
+    chat_service = ChatService()
+    chat_service.set_context(text, chunks)
+    contexts = []
+    def fake_generate(self, query, context, query_type='answer'):
+        contexts.append(context)
+        return "Final summary" if context.startswith("Notes from the document") else "Note [chunk 0]"
+    with patch.object(ChatService, 'generate_response', fake_generate):
+        assert chat_service.get_response("Summarize the document") == ("Final summary", None)
+    map_contexts = contexts[:-1]
+    assert len(map_contexts) > 1
+    # Every chunk is read exactly once by the map step
+    assert sum(c.count("\n[chunk ") for c in map_contexts) == len(chunks)
+    entry = chat_service.query_stats()['recent'][-1]
+    assert entry['strategy'] == 'map_reduce'
+    assert entry['calls'] == len(contexts)
+    assert entry['chunks_read'] == entry['chunks_total'] == len(chunks)
+
+def test_unmatched_query_reads_leading_chunks():
+    """Test queries sharing no terms with a large document make one bounded call."""
+    text, chunks = _large_document()
+    chat_service = ChatService()
+    chat_service.set_context(text, chunks)
+    with patch.object(ChatService, 'generate_response', return_value="Answer") as generate:
+        assert chat_service.get_response("What is this?") == ("Answer", None)
+        assert generate.call_count == 1
+        assert generate.call_args[0][1].startswith("Cite the chunks you use as [chunk N].\n\n[chunk 0 ")
+    assert chat_service.query_stats()['recent'][-1]['strategy'] == 'top_k'
+
+def test_map_reduce_call_cap(monkeypatch):
+    """Test map-reduce samples the document when it needs more calls than allowed."""
+    monkeypatch.setattr(Config, 'MAP_REDUCE_MAX_CALLS', 4)
+    text, chunks = _large_document(pages=200)
+    chat_service = ChatService()
+    chat_service.set_context(text, chunks)
+    with patch.object(ChatService, 'generate_response', return_value="Note [chunk 0]") as generate:
+        chat_service.get_response("Summarize the document")
+        assert generate.call_count <= 4
+    entry = chat_service.query_stats()['recent'][-1]
+    assert entry['chunks_total'] == len(chunks)
+    assert 0 < entry['chunks_read'] < len(chunks)
+    # Two map calls sample both halves of the document
+    map_contexts = [c[0][1] for c in generate.call_args_list[:-1]]
+    assert max(int(n) for c in map_contexts for n in re.findall(r'\[chunk (\d+) ', c)) > len(chunks) // 2
+
+def test_map_reduce_merges_notes_that_overflow_the_budget():
+    """Test notes too large for one call are merged in rounds instead of dropped."""
+    text, chunks = _large_document()
+    chat_service = ChatService()
+    chat_service.set_context(text, chunks)
+    map_notes = []
+    final_contexts = []
+    def fake_generate(self, query, context, query_type='answer'):
+        if query_type == 'answer':
+            final_contexts.append(context)
+            return "Final summary"
+        if query.startswith("Merge"):
+            return "Merged " + " ".join(re.findall(r'Note \d+', context))
+        note = "Note %s" % re.search(r'\[chunk (\d+) ', context).group(1)
+        map_notes.append(note)
+        return note + " detail" * 600  # each note fills about a third of the budget
+    with patch.object(ChatService, 'generate_response', fake_generate):
+        assert chat_service.get_response("Summarize the document") == ("Final summary", None)
+    assert len(map_notes) > 2
+    assert len(final_contexts) == 1
+    # Every map note reached the answer through a merge, none was dropped
+    assert sorted(re.findall(r'Note \d+', final_contexts[0])) == sorted(map_notes)
+    assert chat_service.query_stats()['recent'][-1]['calls'] <= Config.MAP_REDUCE_MAX_CALLS
+
+def test_top_k_ranks_against_the_index_built_at_upload():
+    """Test top-k queries score against precomputed term statistics."""
+    from services import context_policy
+    text, chunks = _large_document()
+    chat_service = ChatService()
+    chat_service.set_context(text, chunks)
+    with patch.object(context_policy.TermIndex, '__init__', side_effect=AssertionError("rebuilt")), \
+            patch.object(ChatService, 'generate_response', return_value="Five years") as generate:
+        assert chat_service.get_response("How long is the warranty period?") == ("Five years", None)
+        assert "warranty period is five years" in generate.call_args[0][1]
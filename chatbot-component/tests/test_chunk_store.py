@@ -0,0 +1,36 @@
+import random
+import pytest
+from services.chunk_store import ChunkStore
+
+@pytest.fixture
+def pieces():
+    rng = random.Random(0)
+    words = "alpha beta gamma delta résumé naïve 数据 analysis".split()
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 200))) + "\n" for _ in range(300)]
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+def test_round_trip(pieces, compression):
+    """Test every chunk and the full text read back exactly."""
+    store = ChunkStore(pieces, compression=compression, block_bytes=4096)
+    assert len(store) == len(pieces)
+    assert [store.get(i) for i in range(len(store))] == pieces
+    assert store.get(17) == pieces[17]
+    assert store.text() == "".join(pieces)
+
+def test_compression_reduces_resident_bytes(pieces):
+    """Test compressed blocks use less memory than the raw text."""
+    plain = ChunkStore(pieces, compression="none")
+    packed = ChunkStore(pieces, compression="zlib", block_bytes=16 * 1024)
+    assert plain.raw_bytes == packed.raw_bytes
+    assert packed.nbytes < plain.nbytes / 2
+    stats = packed.stats()
+    assert stats['blocks'] > 1
+    assert stats['bytes'] == packed.nbytes
+
+def test_empty_store_and_unknown_codec():
+    """Test empty documents and invalid codecs."""
+    store = ChunkStore([])
+    assert len(store) == 0
+    assert store.text() == ""
+    with pytest.raises(ValueError):
+        ChunkStore(["x"], compression="lz4")
@@ -0,0 +1,60 @@
+import pytest
+from services.chunk_table import ChunkTable, build_chunk_table, detect_heading
+
+def test_detect_heading():
+    """Test section heading detection heuristics."""
+    assert detect_heading("1. Introduction") == "1. Introduction"
+    assert detect_heading("2.3 Results and Discussion") == "2.3 Results and Discussion"
+    assert detect_heading("METHODS") == "METHODS"
+    assert detect_heading("This is an ordinary sentence in a paragraph.") is None
+    assert detect_heading("") is None
+    for footer in ("7", "2023", "- 12 -", "$ 1,000", "1 000"):
+        assert detect_heading(footer) is None
+
+def test_page_number_footers_are_not_headings():
+    """Test a page-number footer does not replace the section heading of later chunks."""
+    body = "Plain words in this introduction paragraph go on and on. " * 10
+    text, table = build_chunk_table(["INTRODUCTION\n" + body + "\n7", body + "\n8"], chunk_size=200)
+    assert {table.heading(i) for i in range(len(table))} == {"INTRODUCTION"}
+
+def test_build_chunk_table_pages_and_offsets():
+    """Test that chunks record page ranges and offsets into the joined text."""
+    pages = ["1. Introduction\n" + "alpha " * 50, "", "2. Methods\n" + "beta " * 50]
+    text, table = build_chunk_table(pages, chunk_size=120)
+
+    assert len(table) > 2
+    assert table.page_start[0] == 1
+    assert table.page_end[len(table) - 1] == 3
+    # Empty pages are skipped, never cited
+    assert all(table.page_start[i] != 2 for i in range(len(table)))
+    # Offsets slice back to the chunk text and cover the document in order
+    for i in range(len(table)):
+        chunk = table.chunk_text(i, text)
+        assert chunk and chunk == chunk.strip()
+        if i:
+            assert table.char_start[i] >= table.char_end[i - 1]
+    assert table.heading(0) == "1. Introduction"
+    assert table.heading(len(table) - 1) == "2. Methods"
+    assert table.chunks_for_pages(3, 3) == [i for i in range(len(table)) if table.page_end[i] == 3]
+
+def test_citations_and_labelled_context():
+    """Test citation labels round-trip through a response."""
+    text, table = build_chunk_table(["First page text", "Second page text"], chunk_size=16)
+    context = table.labelled_context(lambda i: table.chunk_text(i, text))
+    assert "[chunk 0 | p. 1]" in context
+    assert "[chunk 1 | p. 2]\nSecond page text" in context
+    assert "[chunk 0" not in table.labelled_context(lambda i: "", [1])
+
+    assert table.citations("See [chunk 1] and [chunk 1 | p. 2], not [chunk 9].") == [1]
+    row = table.row(1)
+    assert row['page_start'] == row['page_end'] == 2
+
+def test_headings_are_interned():
+    """Test repeated headings are stored once."""
+    table = ChunkTable()
+    table.append(1, 1, 0, 10, "Intro")
+    table.append(1, 2, 10, 20, "Intro")
+    table.append(2, 2, 20, 30)
+    assert table.headings == ["Intro"]
+    assert table.heading(1) == "Intro"
+    assert table.heading(2) is None
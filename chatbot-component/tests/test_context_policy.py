@@ -0,0 +1,30 @@
+from services import context_policy
+from services.context_policy import FULL, MAP_REDUCE, TOP_K
+
+def test_choose_strategy():
+    """Test the cheapest fitting strategy is chosen."""
+    assert context_policy.choose_strategy(1000, 3000, "What is the budget?") == FULL
+    assert context_policy.choose_strategy(9000, 3000, "What is the budget?") == TOP_K
+    assert context_policy.choose_strategy(9000, 3000, "Summarize this document") == MAP_REDUCE
+    assert context_policy.choose_strategy(9000, 3000, "What are the main points?") == MAP_REDUCE
+
+def test_rank_chunks():
+    """Test BM25 ranking prefers chunks about the query terms."""
+    texts = [
+        "The weather was sunny all week.",
+        "Quarterly revenue grew and revenue targets were met.",
+        "Revenue is mentioned once here among many other unrelated words in a long sentence.",
+        "",
+    ]
+    assert context_policy.rank_chunks("What was the revenue?", texts) == [1, 2]
+    assert context_policy.rank_chunks("the of and", texts) == []
+
+def test_pack_and_batches():
+    """Test greedy packing and batching respect the token budget."""
+    tokens = [50, 400, 30, 30, 200]
+    assert context_policy.pack([4, 1, 0, 2], tokens, 300) == [0, 2, 4]
+    assert context_policy.pack([4, 1, 0, 2], tokens, 300, limit=2) == [0, 4]
+    assert context_policy.batches(tokens, 300) == [[0], [1], [2, 3, 4]]
+    assert context_policy.batches(tokens, 300, max_batches=3) == [[0], [1], [2, 3, 4]]
+    # Over the limit the batches sample evenly spaced spans of the document
+    assert context_policy.batches([100] * 20, 250, max_batches=4) == [[0, 1], [5, 6], [10, 11], [15, 16]]
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+from io import BytesIO
+from benchmarks.synthetic_corpus import make_pdf, GRAPHICS, BLANK
+from services.extraction_engines import ENGINES, content_has_text, get_engine
+
+@pytest.fixture
+def mixed_pdf():
+    """A PDF with a text page, a graphics-only page and a blank page."""
+    return make_pdf([["Hello world", "Second line"], GRAPHICS, BLANK, ["Last page"]])
+
+def test_content_has_text():
+    """Test detection of text-showing operators in content streams."""
+    assert content_has_text(b"BT /F1 12 Tf (Hi) Tj ET")
+    assert content_has_text(b"BT [(A) 120 (B)] TJ ET")
+    assert not content_has_text(b"q 0.5 g 0 0 10 10 re f Q")
+    assert not content_has_text(b"")
+    assert not content_has_text(None)
+    assert not content_has_text(b"(Tj) Tj q Q BT ET")
+
+def test_content_has_text_is_linear():
+    """Test the pre-scan stays fast on large streams of empty text objects."""
+    started = time.perf_counter()
+    assert not content_has_text(b"BT ET " * 200000)
+    assert content_has_text(b"BT ET " * 200000 + b"BT (Hi) Tj ET")
+    assert time.perf_counter() - started < 1
+
+def test_get_engine_unknown():
+    """Test unknown engine names are rejected."""
+    with pytest.raises(ValueError):
+        get_engine("does-not-exist")
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+@pytest.mark.parametrize("prescan", [False, True])
+def test_engines_extract_pages(name, prescan, mixed_pdf):
+    """Test every installed engine keeps page alignment, with and without pre-scan."""
+    engine = ENGINES[name]
+    if not engine.available():
+        pytest.skip(f"{name} is not installed")
+    pages = engine.extract_pages(BytesIO(mixed_pdf), prescan=prescan)
+    assert len(pages) == 4
+    assert pages[0].split() == ["Hello", "world", "Second", "line"]
+    assert pages[1].strip() == ""
+    assert pages[2].strip() == ""
+    assert pages[3].split() == ["Last", "page"]
+
+def test_prescan_skips_textless_pages(mixed_pdf):
+    """Test the pre-scan never calls the extractor on pages without text."""
+    from unittest.mock import patch
+    from PyPDF2 import PageObject
+    original = PageObject.extract_text
+    calls = []
+    def tracking(self, *args, **kwargs):
+        calls.append(self)
+        return original(self, *args, **kwargs)
+    with patch.object(PageObject, 'extract_text', tracking):
+        get_engine("pypdf2").extract_pages(BytesIO(mixed_pdf), prescan=True)
+    assert len(calls) == 2
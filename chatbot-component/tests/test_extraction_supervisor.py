@@ -0,0 +1,140 @@
+import os
+import time
+import pytest
+from benchmarks.synthetic_corpus import make_pdf
+from services.extraction_engines import ExtractionEngine, get_engine
+from services.extraction_supervisor import ExtractionError, SupervisedExtractor
+
+class PathologicalEngine(ExtractionEngine):
+    """Test engine that misbehaves on chosen pages."""
+
+    name = "pathological"
+
+    def __init__(self, pages, behaviour):
+        self.pages = pages
+        self.behaviour = behaviour
+
+    def page_count(self, stream):
+        return self.pages
+
+    def iter_pages(self, stream, prescan=True, start=0):
+        for index in range(start, self.pages):
+            action = self.behaviour.get(index)
+            if action == 'hang':
+                time.sleep(60)
+            elif action == 'memory':
+                bytearray(8 * 1024 * 1024 * 1024)
+            elif action == 'cpu':
+                while True:
+                    pass
+            elif action == 'error':
+                raise ValueError("broken page")
+            yield f"page {index + 1}"
+
+class PidEngine(ExtractionEngine):
+    """Test engine reporting the process that extracted the document."""
+
+    name = "pid"
+
+    def page_count(self, stream):
+        return 1
+
+    def iter_pages(self, stream, prescan=True, start=0):
+        yield str(os.getpid())
+
+@pytest.fixture
+def supervisor():
+    return SupervisedExtractor(page_timeout=1.0, document_timeout=20.0,
+                               cpu_seconds=2, memory_bytes=1024 * 1024 * 1024)
+
+def test_supervised_extraction_matches_engine(supervisor):
+    """Test supervised extraction returns the same pages as in-process extraction."""
+    data = make_pdf([["alpha beta"], ["gamma"]])
+    pages, skipped = supervisor.extract_pages(data, get_engine("pypdf2"))
+    assert [p.split() for p in pages] == [["alpha", "beta"], ["gamma"]]
+    assert skipped == []
+
+def test_hanging_page_is_skipped(supervisor):
+    """Test a page exceeding the page timeout is skipped and extraction resumes."""
+    engine = PathologicalEngine(3, {1: 'hang'})
+    started = time.monotonic()
+    pages, skipped = supervisor.extract_pages(b"", engine)
+    assert time.monotonic() - started < 10
+    assert pages == ["page 1", "", "page 3"]
+    assert skipped == [{'page': 2, 'reason': 'page-timeout'}]
+
+def test_memory_limit_skips_page(supervisor):
+    """Test a page exceeding the memory limit is skipped."""
+    pages, skipped = supervisor.extract_pages(b"", PathologicalEngine(2, {0: 'memory'}))
+    assert pages == ["", "page 2"]
+    assert skipped == [{'page': 1, 'reason': 'memory-limit'}]
+
+def test_cpu_limit_skips_page():
+    """Test a page exceeding the CPU limit is skipped."""
+    supervisor = SupervisedExtractor(page_timeout=10.0, cpu_seconds=1)
+    pages, skipped = supervisor.extract_pages(b"", PathologicalEngine(2, {0: 'cpu'}))
+    assert pages == ["", "page 2"]
+    assert skipped == [{'page': 1, 'reason': 'cpu-limit'}]
+
+def test_document_timeout_skips_remaining_pages():
+    """Test the document budget bounds total time and reports the remaining pages."""
+    supervisor = SupervisedExtractor(page_timeout=1.0, document_timeout=1.5)
+    pages, skipped = supervisor.extract_pages(b"", PathologicalEngine(4, {1: 'hang', 2: 'hang'}))
+    assert pages[0] == "page 1"
+    assert [s['page'] for s in skipped] == [2, 3, 4]
+    assert skipped[-1]['reason'] == 'document-timeout'
+
+def test_page_and_text_limits():
+    """Test page-count and text-size guards."""
+    with pytest.raises(ExtractionError, match="limit is 2"):
+        SupervisedExtractor(max_pages=2).extract_pages(b"", PathologicalEngine(3, {}))
+
+    pages, skipped = SupervisedExtractor(max_text_chars=10).extract_pages(b"", PathologicalEngine(3, {}))
+    assert pages == ["page 1", "", ""]
+    assert [s['reason'] for s in skipped] == ['text-limit', 'text-limit']
+
+def test_engine_error_is_raised(supervisor):
+    """Test ordinary extraction errors fail the document as before."""
+    with pytest.raises(ExtractionError, match="broken page"):
+        supervisor.extract_pages(b"", PathologicalEngine(2, {1: 'error'}))
+
+def test_workers_are_reused_across_documents(supervisor):
+    """Test documents share a warm worker and a killed worker is replaced."""
+    first, _ = supervisor.extract_pages(b"", PidEngine())
+    second, _ = supervisor.extract_pages(b"", PidEngine())
+    assert first == second
+    supervisor.extract_pages(b"", PathologicalEngine(1, {0: 'hang'}))
+    third, skipped = supervisor.extract_pages(b"", PidEngine())
+    assert third != first and skipped == []
+
+def test_supervision_overhead_per_document(supervisor):
+    """Test a warm worker adds little to extracting a small PDF."""
+    data = make_pdf([["alpha beta"], ["gamma"], ["delta"]])
+    engine = get_engine("pypdf2")
+    supervisor.start()
+    supervisor.extract_pages(data, engine)
+    started = time.perf_counter()
+    for _ in range(20):
+        supervisor.extract_pages(data, engine)
+    assert (time.perf_counter() - started) / 20 < 0.05
+
+def test_workers_start_outside_the_lock(monkeypatch):
+    """Test a slow worker start does not block other callers of the pool."""
+    import threading
+    import services.extraction_supervisor as extraction_supervisor
+    release = threading.Event()
+    class SlowWorker:
+        def __init__(self, *args):
+            release.wait(5)
+    monkeypatch.setattr(extraction_supervisor, '_Worker', SlowWorker)
+    supervisor = SupervisedExtractor(workers=2)
+    starter = threading.Thread(target=supervisor.start)
+    starter.start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    supervisor.start()  # the pool is already being filled
+    supervisor.close()
+    assert time.monotonic() - started < 1
+    release.set()
+    starter.join()
+    assert len(supervisor._idle) == 2
@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from services.model_router import (CircuitBreaker, EXTRACT, ModelRouter, Upstream,
+                                   UpstreamUnavailable)
+
+class FakeOpenAI:
+    """Local OpenAI-compatible server whose behaviour can be switched per test."""
+
+    def __init__(self, name):
+        self.name = name
+        self.mode = 'ok'
+        self.models = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                fake.models.append(body['model'])
+                if fake.mode == 'slow':
+                    time.sleep(1.5)
+                if fake.mode == 'error':
+                    status, payload = 500, {'error': {'message': 'upstream broke', 'type': 'server_error'}}
+                elif fake.mode == 'bad_request':
+                    status, payload = 400, {'error': {'message': 'bad request', 'type': 'invalid_request_error'}}
+                else:
+                    status, payload = 200, {
+                        'id': 'chatcmpl-test', 'object': 'chat.completion', 'model': body['model'],
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': f'from {fake.name}'}}],
+                        'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2},
+                    }
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.api_base = f'http://127.0.0.1:{self.server.server_address[1]}/v1'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def servers():
+    primary, fallback = FakeOpenAI('primary'), FakeOpenAI('fallback')
+    yield primary, fallback
+    primary.close()
+    fallback.close()
+
+def make_router(servers, failure_threshold=2, reset_seconds=60.0):
+    upstreams = [Upstream(s.name, s.api_base, 'test-key', CircuitBreaker(failure_threshold, reset_seconds))
+                 for s in servers]
+    return ModelRouter('default-model', 'fast-model', 'large-model',
+                       default_context_tokens=1000, fast_max_prompt_tokens=50,
+                       response_reserve_tokens=100, upstreams=upstreams, timeout=0.5)
+
+def messages(size):
+    return [{'role': 'system', 'content': 'x' * (size * 4)}, {'role': 'user', 'content': 'q'}]
+
+def test_choose_model():
+    """Test routing by prompt size and query type."""
+    router = make_router([])
+    assert router.choose_model(10) == 'fast-model'
+    assert router.choose_model(500) == 'default-model'
+    assert router.choose_model(500, EXTRACT) == 'fast-model'
+    assert router.choose_model(950) == 'large-model'
+
+def test_routes_to_model_on_primary(servers):
+    """Test requests reach the primary upstream with the routed model."""
+    primary, fallback = servers
+    router = make_router(servers)
+    assert router.complete(messages(500)) == 'from primary'
+    assert router.complete(messages(950)) == 'from primary'
+    assert primary.models == ['default-model', 'large-model']
+    assert fallback.models == []
+
+def test_fails_over_on_timeout(servers):
+    """Test a slow primary fails over to the secondary within the timeout."""
+    primary, fallback = servers
+    primary.mode = 'slow'
+    router = make_router(servers)
+    started = time.monotonic()
+    assert router.complete(messages(10)) == 'from fallback'
+    assert time.monotonic() - started < 1.5
+    assert router.stats()['upstreams']['primary']['failures'] == 1
+
+def test_circuit_opens_on_upstream_errors(servers):
+    """Test repeated upstream errors open the primary's circuit so it is skipped."""
+    primary, fallback = servers
+    primary.mode = 'error'
+    router = make_router(servers, failure_threshold=2)
+    for _ in range(4):
+        assert router.complete(messages(10)) == 'from fallback'
+    # Two failures opened the circuit; later requests went straight to the fallback
+    assert len(primary.models) == 2
+    assert len(fallback.models) == 4
+    assert router.stats()['upstreams']['primary']['state'] == 'open'
+
+def test_half_open_trial_closes_circuit(servers):
+    """Test a successful trial request after the reset period closes the circuit."""
+    primary, fallback = servers
+    primary.mode = 'error'
+    router = make_router(servers, failure_threshold=1, reset_seconds=0.2)
+    assert router.complete(messages(10)) == 'from fallback'
+    assert router.stats()['upstreams']['primary']['state'] == 'open'
+    primary.mode = 'ok'
+    time.sleep(0.3)
+    assert router.complete(messages(10)) == 'from primary'
+    assert router.stats()['upstreams']['primary']['state'] == 'closed'
+
+def test_all_upstreams_down(servers):
+    """Test a clear error when every upstream fails."""
+    for server in servers:
+        server.mode = 'error'
+    router = make_router(servers)
+    with pytest.raises(UpstreamUnavailable):
+        router.complete(messages(10))
+
+def test_bad_request_does_not_fail_over(servers):
+    """Test client errors are raised without trying the secondary."""
+    primary, fallback = servers
+    primary.mode = 'bad_request'
+    router = make_router(servers)
+    with pytest.raises(Exception, match='bad request'):
+        router.complete(messages(10))
+    assert fallback.models == []
+    assert router.stats()['upstreams']['primary']['state'] == 'closed'
+
+def test_client_errors_do_not_reset_the_failure_count(servers):
+    """Test upstream failures interleaved with client errors still open the circuit."""
+    primary, fallback = servers
+    router = make_router(servers, failure_threshold=2)
+    primary.mode = 'error'
+    assert router.complete(messages(10)) == 'from fallback'
+    primary.mode = 'bad_request'
+    with pytest.raises(Exception, match='bad request'):
+        router.complete(messages(10))
+    primary.mode = 'error'
+    assert router.complete(messages(10)) == 'from fallback'
+    assert router.stats()['upstreams']['primary']['state'] == 'open'
+
+def test_client_error_releases_half_open_trial():
+    """Test a client error during a half-open trial lets the next trial through."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release_trial()
+    assert breaker.allow()
@@ -48,3 +48,49 @@ def test_extract_text_invalid_pdf(tmp_path):
     text, error = processor.extract_text(file_storage)
     assert error is not None
     assert "Error extracting text from PDF" in error
+
+def test_extract_document_chunks(sample_pdf):
+    """Test PDF extraction returns page-aware chunk metadata."""
+    processor = PDFProcessor()
+    
+    with open(sample_pdf, 'rb') as f:
+        file_storage = FileStorage(
+            stream=BytesIO(f.read()),
+            filename='test.pdf',
+            content_type='application/pdf'
+        )
+        text, chunks, skipped, error = processor.extract_document(file_storage)
+        assert error is None, f"Error occurred: {error}"
+        assert skipped == []
+        assert len(chunks) == 1
+        assert chunks.row(0)['page_start'] == 1
+        assert chunks.chunk_text(0, text) == text
+
+def test_extract_document_engine_selection(monkeypatch):
+    """Test large files use the configured large-document engine."""
+    from config import Config
+    processor = PDFProcessor()
+    monkeypatch.setattr(Config, 'PDF_ENGINE', 'pypdf2')
+    monkeypatch.setattr(Config, 'PDF_LARGE_ENGINE', 'does-not-exist')
+    monkeypatch.setattr(Config, 'PDF_LARGE_FILE_BYTES', 10)
+    
+    file_storage = FileStorage(
+        stream=BytesIO(b"%PDF-1.4 more than ten bytes"),
+        filename='large.pdf',
+        content_type='application/pdf'
+    )
+    text, chunks, skipped, error = processor.extract_document(file_storage)
+    assert "Unknown PDF extraction engine: does-not-exist" in error
+
+def test_validate_pdf_checks_header_only(monkeypatch):
+    """Test validation checks the header without parsing the document in-process."""
+    import services.pdf_processor as pdf_processor
+    def fail(stream):
+        raise AssertionError("validate_pdf must not parse the PDF")
+    monkeypatch.setattr(pdf_processor, '_pdf_reader', fail)
+    processor = PDFProcessor()
+    valid = FileStorage(stream=BytesIO(b"%PDF-1.7\n% broken body"), filename='a.pdf')
+    assert processor.validate_pdf(valid) == (True, None)
+    assert valid.stream.tell() == 0
+    is_valid, error = processor.validate_pdf(FileStorage(stream=BytesIO(b"not a pdf"), filename='b.pdf'))
+    assert not is_valid and "%PDF-" in error
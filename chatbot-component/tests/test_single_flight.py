@@ -0,0 +1,61 @@
+import threading
+import pytest
+from services.single_flight import SingleFlight
+
+def run_concurrently(flight, key, fn, callers):
+    """Start callers that all call flight.do(key, fn) and return their results."""
+    results = [None] * callers
+    def call(i):
+        try:
+            results[i] = flight.do(key, fn)
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    return threads, results
+
+def test_identical_calls_share_one_execution():
+    """Test concurrent identical calls wait on one computation."""
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+    def compute():
+        executions.append(1)
+        release.wait(5)
+        return "result"
+    
+    threads, results = run_concurrently(flight, "key", compute, 5)
+    # Wait until every caller is either computing or waiting
+    for _ in range(500):
+        if flight.stats()['waiting'] == 4:
+            break
+        threading.Event().wait(0.01)
+    assert flight.stats()['in_flight'] == 1
+    release.set()
+    for t in threads:
+        t.join()
+    
+    assert results == ["result"] * 5
+    assert len(executions) == 1
+    stats = flight.stats()
+    assert stats['calls'] == 5
+    assert stats['executions'] == 1
+    assert stats['coalesced'] == 4
+    assert stats['max_waiters'] == 4
+    assert stats['in_flight'] == stats['waiting'] == 0
+
+def test_errors_are_shared_and_not_cached():
+    """Test waiters receive the leader's exception and later calls run again."""
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("key", lambda: 42) == 42
+    assert flight.stats()['executions'] == 2
+
+def test_different_keys_run_independently():
+    """Test calls with different keys are not coalesced."""
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()['coalesced'] == 0